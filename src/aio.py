@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Asyncio facade over the extractor for embedding in async services.
+
+    async with AsyncExtractor(workers=4) as extractor:
+        outline = await extractor.extract("doc.pdf", timeout=10)
+        async for source, result, error in extractor.iter_batch(paths):
+            ...
+
+Extraction runs on a bounded process pool, never on the event loop. At most
+``max_concurrency`` documents are submitted at once, so batches of any size
+keep memory and the executor queue flat. ``executor='thread'`` instead runs
+documents one at a time on a single background thread: PyMuPDF is not safe
+to use from several threads and holds the GIL, so this only keeps work off
+the event loop, for hosts that cannot start processes.
+"""
+
+import argparse
+import asyncio
+import os
+from typing import AsyncIterator, Dict, Iterable, Optional, Tuple, Union
+
+import main
+from cache import ResultCache
+from config import ASYNC_QUEUE_PER_WORKER, MAX_PAGES_TO_ANALYZE, MAX_PROCESSING_TIME
+
+Source = Union[str, os.PathLike, bytes]
+
+_default_extractor = None
+
+
+def _extract(extractor, cache, source: Source) -> Dict:
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        result = extractor.extract_outline(None, stream=bytes(source))
+    else:
+        result = main.extract_cached(os.fspath(source), extractor, cache)
+    if extractor.error:
+        result = dict(result, error=extractor.error)
+    return result
+
+
+def _extract_in_process(source: Source) -> Dict:
+    return _extract(main._worker_extractor, main._worker_cache, source)
+
+
+
+
+class AsyncExtractor:
+    """Bounded executor plus concurrency limit for awaiting outline extractions.
+
+    A call that times out or is cancelled before its document starts is
+    dropped from the queue; one already running finishes in the background
+    within the document's ``max_seconds`` budget, and its slot is freed then.
+    """
+
+    def __init__(self, workers: Optional[int] = None, max_concurrency: Optional[int] = None,
+                 executor: str = 'process', cache_dir: Optional[str] = None,
+                 max_seconds: float = MAX_PROCESSING_TIME, max_pages: int = MAX_PAGES_TO_ANALYZE,
+                 use_toc: bool = True):
+        if executor == 'thread':
+            if workers and workers > 1:
+                raise ValueError("executor='thread' runs a single worker thread; use 'process' for parallelism")
+            workers = 1
+        self.workers = workers or os.cpu_count() or 1
+        self.max_concurrency = max_concurrency or self.workers * ASYNC_QUEUE_PER_WORKER
+        self.args = argparse.Namespace(page_workers=1, max_seconds=max_seconds, max_pages=max_pages,
+                                       no_toc=not use_toc, cache_dir=cache_dir)
+        if executor == 'process':
+            from concurrent.futures import ProcessPoolExecutor
+
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=main._init_warm_worker,
+                                             initargs=(self.args,))
+            self._job = _extract_in_process
+        elif executor == 'thread':
+            from concurrent.futures import ThreadPoolExecutor
+
+            self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="outline")
+            self._extractor = None
+            self._cache = None
+            self._job = self._extract_in_thread
+        else:
+            raise ValueError(f"executor must be 'process' or 'thread', not {executor!r}")
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._slots_loop = None
+
+    def _extract_in_thread(self, source: Source) -> Dict:
+        # only ever called on the single pool thread
+        if self._extractor is None:
+            self._extractor = main.build_extractor(self.args)
+            self._cache = ResultCache(self.args.cache_dir) if self.args.cache_dir else None
+        return _extract(self._extractor, self._cache, source)
+
+    async def extract(self, source: Source, timeout: Optional[float] = None) -> Dict:
+        """Extract the outline of a PDF path or PDF bytes.
+
+        Raises ``asyncio.TimeoutError`` after ``timeout`` seconds; failures
+        inside the extractor are reported in an ``error`` entry of the result.
+        """
+        loop = asyncio.get_running_loop()
+        if self._slots_loop is not loop:
+            self._slots = asyncio.Semaphore(self.max_concurrency)
+            self._slots_loop = loop
+        slots = self._slots
+        await slots.acquire()
+        try:
+            future = self._pool.submit(self._job, source)
+        except BaseException:
+            slots.release()
+            raise
+
+        def release(_):
+            # the slot is held until the job really ends, not when the caller stops waiting
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(slots.release)
+
+        future.add_done_callback(release)
+        return await asyncio.wait_for(asyncio.wrap_future(future, loop=loop), timeout)
+
+    async def iter_batch(self, sources: Iterable[Source],
+                         timeout: Optional[float] = None) -> AsyncIterator[Tuple[Source, Optional[Dict], Optional[str]]]:
+        """Yield (source, result, error) for each source in completion order.
+
+        Sources are pulled lazily, ``max_concurrency`` at a time, so a
+        generator over millions of paths is fine. ``timeout`` applies per
+        document; a timed-out document is reported with an error, not raised.
+        """
+        sources = iter(sources)
+        pending = {}
+
+        def refill():
+            for source in sources:
+                pending[asyncio.ensure_future(self.extract(source, timeout))] = source
+                if len(pending) >= self.max_concurrency:
+                    break
+
+        refill()
+        try:
+            while pending:
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    source = pending.pop(task)
+                    try:
+                        yield source, task.result(), None
+                    except asyncio.TimeoutError:
+                        yield source, None, f"timed out after {timeout}s"
+                    except Exception as e:
+                        yield source, None, str(e)
+                refill()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def close(self, wait: bool = True):
+        self._pool.shutdown(wait=wait, cancel_futures=True)
+
+    async def __aenter__(self) -> "AsyncExtractor":
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await asyncio.get_running_loop().run_in_executor(None, self.close)
+
+
+def _get_default() -> AsyncExtractor:
+    global _default_extractor
+    if _default_extractor is None:
+        _default_extractor = AsyncExtractor()
+    return _default_extractor
+
+
+async def extract_outline_async(source: Source, timeout: Optional[float] = None) -> Dict:
+    """Await the outline of a PDF path or bytes on a shared process pool."""
+    return await _get_default().extract(source, timeout)
+
+
+def iter_outlines_async(sources: Iterable[Source],
+                        timeout: Optional[float] = None) -> AsyncIterator[Tuple[Source, Optional[Dict], Optional[str]]]:
+    """``async for source, result, error in iter_outlines_async(paths)`` on the shared pool."""
+    return _get_default().iter_batch(sources, timeout)
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Benchmark PDFOutlineExtractor over the sample corpus and synthetic documents.
+
+    python bench.py                              # run and write bench_results.json
+    python bench.py --baseline old.json          # also flag regressions against a baseline
+
+Reports pages/sec, per-document p50/p95 latency, peak RSS and the time split
+across the triage, structure-analysis, title, bookmark and headings stages. Pages are
+laid out lazily, so layout cost is billed to the first stage that reads a page.
+"""
+
+import argparse
+import json
+import os
+import platform
+import resource
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from config import BENCH_HEADING_DENSITY, BENCH_REGRESSION_TOLERANCE, BENCH_SYNTHETIC_PAGES, INPUT_DIR
+from main import PDFOutlineExtractor
+
+STAGES = ("triage", "structure", "title", "toc", "headings")
+LINES_PER_PAGE = 40
+
+
+def make_synthetic_pdf(path: str, pages: int, heading_density: float = BENCH_HEADING_DENSITY):
+    """Write a PDF of ``pages`` pages where ``heading_density`` of the lines are headings."""
+    import fitz
+
+    doc = fitz.open()
+    every = max(1, round(1 / heading_density)) if heading_density > 0 else 0
+    chapter = section = 0
+    for _ in range(pages):
+        page = doc.new_page()
+        y = 60
+        for line_no in range(LINES_PER_PAGE):
+            if every and line_no % every == 0:
+                if section % 4 == 0:
+                    chapter += 1
+                    text, size = f"{chapter}. Chapter Heading {chapter}", 18
+                else:
+                    text, size = f"{chapter}.{section % 4}. Section Heading", 14
+                section += 1
+                page.insert_text((60, y), text, fontsize=size, fontname="hebo")
+                y += size + 6
+            else:
+                page.insert_text((60, y), f"Body text line {line_no} with ordinary words in it.",
+                                 fontsize=10, fontname="helv")
+                y += 16
+            if y > page.rect.height - 40:
+                break
+    doc.save(path)
+    doc.close()
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile."""
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(fraction * len(ordered) + 0.5) - 1))
+    return ordered[index]
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def bench_documents(name: str, paths: List[str], repeat: int) -> Dict:
+    """Extract every document ``repeat`` times and summarize the runs."""
+    import fitz
+
+    extractor = PDFOutlineExtractor(max_seconds=0, max_pages=0, instrument=True)
+    # one untimed pass so lazy imports and langdetect profiles are not billed to the first run
+    extractor.extract_outline(paths[0])
+    stage_seconds = dict.fromkeys(STAGES, 0.0)
+    latencies = []
+    total_pages = 0
+    total_seconds = 0.0
+    for path in paths:
+        with fitz.open(path) as doc:
+            page_count = len(doc)
+        for _ in range(repeat):
+            started = time.perf_counter()
+            extractor.extract_outline(path)
+            elapsed = time.perf_counter() - started
+            for stage, seconds in extractor.metrics.stages.items():
+                stage_seconds[stage] = stage_seconds.get(stage, 0.0) + seconds
+            latencies.append(elapsed)
+            total_pages += page_count
+            total_seconds += elapsed
+
+    stage_total = sum(stage_seconds.values()) or 1.0
+    return {
+        "name": name,
+        "documents": len(paths),
+        "runs": len(latencies),
+        "pages": total_pages,
+        "seconds": round(total_seconds, 4),
+        "pages_per_sec": round(total_pages / total_seconds, 2) if total_seconds else 0.0,
+        "p50_ms": round(1000 * statistics.median(latencies), 3) if latencies else 0.0,
+        "p95_ms": round(1000 * percentile(latencies, 0.95), 3) if latencies else 0.0,
+        "stage_seconds": {stage: round(sec, 4) for stage, sec in stage_seconds.items()},
+        "stage_share": {stage: round(sec / stage_total, 3) for stage, sec in stage_seconds.items()},
+    }
+
+
+def compare(results: Dict, baseline: Dict, tolerance: float = BENCH_REGRESSION_TOLERANCE) -> List[str]:
+    """Return a message for every suite that got slower than ``tolerance`` allows."""
+    previous = {suite["name"]: suite for suite in baseline.get("suites", [])}
+    regressions = []
+    for suite in results["suites"]:
+        old = previous.get(suite["name"])
+        if not old:
+            continue
+        if old["pages_per_sec"] and suite["pages_per_sec"] < old["pages_per_sec"] * (1 - tolerance):
+            regressions.append(f"{suite['name']}: pages/sec {old['pages_per_sec']} -> {suite['pages_per_sec']}")
+        if old["p95_ms"] and suite["p95_ms"] > old["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{suite['name']}: p95 {old['p95_ms']}ms -> {suite['p95_ms']}ms")
+    return regressions
+
+
+def run(args: argparse.Namespace) -> Dict:
+    suites = []
+    if not args.no_corpus:
+        corpus = sorted(str(path) for path in Path(args.input_dir).glob("*.pdf"))
+        if corpus:
+            suites.append(bench_documents("corpus", corpus, args.repeat))
+
+    if args.pages:
+        with tempfile.TemporaryDirectory(prefix="outline-bench-") as tmp_dir:
+            for pages in args.pages:
+                path = os.path.join(tmp_dir, f"synthetic-{pages}.pdf")
+                make_synthetic_pdf(path, pages, args.heading_density)
+                suites.append(bench_documents(f"synthetic-{pages}", [path], args.repeat))
+
+    return {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "suites": suites,
+    }
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark the PDF outline extractor")
+    parser.add_argument("--input-dir", default=INPUT_DIR, help="directory of sample PDFs")
+    parser.add_argument("--pages", type=lambda value: [int(n) for n in value.split(",") if n],
+                        default=list(BENCH_SYNTHETIC_PAGES),
+                        help="comma-separated page counts of synthetic PDFs (empty to skip)")
+    parser.add_argument("--heading-density", type=float, default=BENCH_HEADING_DENSITY,
+                        help="fraction of synthetic lines that are headings")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per document")
+    parser.add_argument("--no-corpus", action="store_true", help="skip the sample corpus")
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--baseline", default=None, help="earlier results to compare against")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    results = run(args)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+
+    for suite in results["suites"]:
+        shares = ", ".join(f"{stage} {share:.0%}" for stage, share in suite["stage_share"].items())
+        print(f"{suite['name']:>16}: {suite['pages_per_sec']:>9.1f} pages/s  "
+              f"p50 {suite['p50_ms']:.1f}ms  p95 {suite['p95_ms']:.1f}ms  ({shares})")
+    print(f"peak RSS {results['peak_rss_mb']} MB; results written to {args.output}")
+
+    regressions: Optional[List[str]] = None
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            regressions = compare(results, json.load(f))
+        for message in regressions:
+            print(f"REGRESSION {message}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Per-document processing budgets and the worker-process watchdog.
+"""
+
+import faulthandler
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, Optional, Set, Tuple
+
+
+def current_rss_mb() -> Optional[float]:
+    """Resident set size of this process in MiB, or None where /proc is unavailable."""
+    try:
+        with open('/proc/self/statm', 'rb') as f:
+            resident_pages = int(f.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return resident_pages * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+
+
+class ExtractionBudget:
+    """Wall-clock, page and memory limits for extracting one document.
+
+    A limit of ``None`` or ``0`` means unlimited. When the process RSS passes
+    ``max_rss_mb``, ``release`` (if given) is called to drop caches before the
+    document is declared over budget.
+    """
+
+    def __init__(self, max_seconds: Optional[float] = None, max_pages: Optional[int] = None,
+                 max_rss_mb: Optional[float] = None, release: Optional[Callable[[], None]] = None):
+        self.max_seconds = max_seconds or None
+        self.max_pages = max_pages or None
+        self.max_rss_mb = max_rss_mb or None
+        self.release = release
+        self.started = time.perf_counter()
+        self.pages_scanned = 0
+        self.page_count = 0
+        self.truncated: Optional[str] = None
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left before the time budget runs out, or None if unlimited."""
+        if self.max_seconds is None:
+            return None
+        return max(0.0, self.max_seconds - self.elapsed())
+
+    def page_limit(self, start: int, end: int) -> int:
+        """Clamp a page range end to the page budget."""
+        if self.max_pages is None:
+            return end
+        return min(end, start + self.max_pages)
+
+    def exhausted(self) -> bool:
+        """Return True (and remember why) once the time or memory budget has run out."""
+        if self.max_seconds is not None and self.elapsed() >= self.max_seconds:
+            self.truncated = "time"
+        elif self.max_rss_mb is not None and self.truncated is None and self._over_memory():
+            self.truncated = "memory"
+        return self.truncated is not None
+
+    def _over_memory(self) -> bool:
+        rss = current_rss_mb()
+        if rss is None or rss <= self.max_rss_mb:
+            return False
+        if self.release:
+            self.release()
+            rss = current_rss_mb()
+        return rss > self.max_rss_mb
+
+    def report(self) -> Dict:
+        """Budget use for this document."""
+        return {
+            "elapsed_seconds": round(self.elapsed(), 3),
+            "pages_scanned": self.pages_scanned,
+            "page_count": self.page_count,
+            "truncated": self.truncated,
+        }
+
+    def marker(self) -> Dict:
+        """The ``truncated`` entry added to a partial outline."""
+        return {
+            "reason": self.truncated,
+            "pages_scanned": self.pages_scanned,
+            "page_count": self.page_count,
+        }
+
+
+def arm_watchdog(seconds: Optional[float]):
+    """Kill this process (with a traceback on stderr) if it is still busy after ``seconds``.
+
+    Runs on a C-level timer thread, so it also fires while fitz is stuck in
+    native code where no Python-level timeout can interrupt it.
+    """
+    if seconds:
+        faulthandler.dump_traceback_later(seconds, exit=True, file=sys.stderr)
+
+
+def disarm_watchdog():
+    faulthandler.cancel_dump_traceback_later()
+
+
+class WorkerWatchdog:
+    """Hard per-job time limit for pool workers, with a way to tell which job hung.
+
+    Each worker writes a heartbeat file (input path and start time) while it
+    runs a job.  When a worker is killed the pool breaks; ``inspect_break`` then reads
+    the heartbeats left behind to separate the job that outlived the limit from
+    jobs that were merely running alongside it.
+    """
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.heartbeat_dir = tempfile.mkdtemp(prefix="outline-watchdog-")
+
+    def _heartbeat_path(self) -> str:
+        return os.path.join(self.heartbeat_dir, f"{os.getpid()}.json")
+
+    def begin(self, input_path: str):
+        """Called in the worker before a job starts."""
+        with open(self._heartbeat_path(), 'w', encoding='utf-8') as f:
+            json.dump({"input": input_path, "started": time.time()}, f)
+        arm_watchdog(self.seconds)
+
+    def end(self):
+        """Called in the worker after a job finishes."""
+        disarm_watchdog()
+        try:
+            os.remove(self._heartbeat_path())
+        except OSError:
+            pass
+
+    def inspect_break(self) -> Tuple[Set[str], Set[str]]:
+        """After a pool break, return (jobs that hit the limit, other jobs that were running)."""
+        hung, running = set(), set()
+        now = time.time()
+        for name in os.listdir(self.heartbeat_dir):
+            path = os.path.join(self.heartbeat_dir, name)
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    beat = json.load(f)
+            except (OSError, ValueError):
+                continue
+            finally:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            if now - beat["started"] >= self.seconds * 0.95:
+                hung.add(beat["input"])
+            else:
+                running.add(beat["input"])
+        return hung, running
+
+    def close(self):
+        shutil.rmtree(self.heartbeat_dir, ignore_errors=True)
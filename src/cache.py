@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Content-addressed on-disk cache of extraction results.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Optional
+
+import config
+from config import RESULT_CACHE_EVICT_TO, RESULT_CACHE_MAX_ENTRIES
+
+# Modules whose source determines the extraction result.
+_FINGERPRINT_MODULES = ('main.py', 'utils.py', 'rules.py', 'font_stats.py', 'layout.py', 'scoring.py',
+                        'language.py', 'triage.py', 'config.py')
+_IGNORED_SETTINGS = ('INPUT_DIR', 'OUTPUT_DIR')
+
+
+def hash_file(path: str, chunk_size: int = 1 << 20) -> str:
+    """Return the SHA-256 hex digest of a file's bytes."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+@lru_cache(maxsize=None)
+def extractor_fingerprint() -> str:
+    """Fingerprint of the config thresholds/patterns and the extractor source."""
+    digest = hashlib.sha256()
+    settings = {name: value for name, value in vars(config).items()
+                if name.isupper() and name not in _IGNORED_SETTINGS}
+    digest.update(json.dumps(settings, sort_keys=True, default=str).encode('utf-8'))
+
+    src_dir = Path(__file__).resolve().parent
+    for name in _FINGERPRINT_MODULES:
+        path = src_dir / name
+        if path.exists():
+            digest.update(path.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+class ResultCache:
+    """Outline results keyed by PDF content hash plus extractor fingerprint.
+
+    Entries are individual JSON files; a hit refreshes the file's mtime and
+    the oldest entries are evicted once ``max_entries`` is exceeded, giving
+    LRU behaviour that is safe to share between worker processes.
+
+    The directory is listed once per process to seed a running entry count;
+    only when that count passes ``max_entries`` is it listed and sorted again,
+    evicting down to RESULT_CACHE_EVICT_TO of the limit in one batch. Entries
+    written by other processes are picked up at that point, so a shared cache
+    can overshoot the limit by what the other workers wrote in between.
+    """
+
+    def __init__(self, cache_dir: str, max_entries: int = RESULT_CACHE_MAX_ENTRIES):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self._count: Optional[int] = None
+
+    def key_for(self, pdf_path: str, settings: Optional[Dict] = None) -> str:
+        """Return the cache key for a PDF file extracted with the given extractor ``settings``."""
+        key = f"{hash_file(pdf_path)}-{extractor_fingerprint()}"
+        if settings:
+            options = json.dumps(settings, sort_keys=True, default=str).encode('utf-8')
+            key += f"-{hashlib.sha256(options).hexdigest()[:8]}"
+        return key
+
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Return the cached result for a key, or None on a miss."""
+        path = self._entry_path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                result = json.load(f)
+        except (OSError, ValueError):
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return result
+
+    def put(self, key: str, result: Dict):
+        """Store a result atomically and evict the least recently used entries."""
+        if self._count is None:
+            self._count = sum(1 for _ in self._entries())
+        entry_path = self._entry_path(key)
+        is_new = not entry_path.exists()
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(result, f, ensure_ascii=False)
+            os.replace(tmp_path, entry_path)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self._count += is_new
+        if self._count > self.max_entries:
+            self._evict()
+
+    def _entries(self):
+        return (entry.path for entry in os.scandir(self.cache_dir) if entry.name.endswith('.json'))
+
+    def _evict(self):
+        """Drop the least recently used entries down to RESULT_CACHE_EVICT_TO of the limit."""
+        entries = [Path(path) for path in self._entries()]
+        excess = len(entries) - int(self.max_entries * RESULT_CACHE_EVICT_TO)
+        self._count = len(entries)
+        if len(entries) <= self.max_entries:
+            return
+
+        def mtime(path: Path) -> float:
+            try:
+                return path.stat().st_mtime
+            except OSError:
+                return 0.0
+
+        for path in sorted(entries, key=mtime)[:excess]:
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            self._count -= 1
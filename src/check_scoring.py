@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Guard against drift between the NumPy heading scorer and the per-line fallback.
+
+Scores randomized pages, and every page of the PDFs in INPUT_DIR when fitz
+is installed, through ``PDFOutlineExtractor._extract_page_headings`` twice:
+once with ``scoring.score_page`` and once with the line-by-line
+``heading_decision``/``detect_heading_level`` path used when NumPy is
+missing. Fails if the headings or the per-rule counters differ.
+
+    python check_scoring.py [--pages N] [--seed S] [--no-corpus]
+"""
+
+import argparse
+import random
+import sys
+from contextlib import closing
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple
+
+import main as outline
+from config import INPUT_DIR, SUPPORTED_LANGUAGES
+from font_stats import FontStatistics
+from instrument import Instrumentation
+from layout import LineRecord, PageLines
+from linestore import StoredLayout
+
+LINES_PER_PAGE = 40
+WORDS = ("overview", "introduction", "results", "method", "the", "of", "data", "system", "analysis", "and")
+CJK_WORDS = ("概要", "はじめに", "背景", "結果", "方法", "第1章", "歴史的背景", "总结", "개요")
+SIZES = (8.0, 9.0, 10.0, 10.5, 11.0, 12.0, 13.0, 14.0, 16.0, 18.0, 20.0, 24.0)
+
+
+def random_text(rng: random.Random) -> str:
+    """A stripped line of the kinds the heading rules tell apart."""
+    words = [rng.choice(WORDS) for _ in range(rng.randint(1, 12))]
+    kind = rng.randrange(9)
+    if kind == 0:
+        text = f"{rng.randint(1, 9)}.{rng.randint(1, 9)} " + " ".join(words).title()
+    elif kind == 1:
+        text = " ".join(words).upper()
+    elif kind == 2:
+        text = " ".join(words).title()
+    elif kind == 3:
+        text = " ".join(words).capitalize() + "."
+    elif kind == 4:
+        text = "".join(rng.choice(CJK_WORDS) for _ in range(rng.randint(1, 4)))
+    elif kind == 5:
+        text = rng.choice(("Chapter", "Section", "Appendix", "Part")) + f" {rng.randint(1, 20)}"
+    elif kind == 6:
+        text = rng.choice(("a", "1", "•", "ab"))
+    elif kind == 7:
+        text = " ".join(rng.choice(WORDS) for _ in range(rng.randint(40, 60)))
+    else:
+        text = " ".join(words)
+    return text.strip() or "x"
+
+
+def make_page(records: List[LineRecord]) -> PageLines:
+    """Build a line table the way layout.build_page_lines fills one."""
+    page_lines = PageLines()
+    for line in records:
+        page_lines.lines.append(line)
+        page_lines.line_sizes.append(line.size)
+        page_lines.line_lengths.append(len(line.text))
+        page_lines.line_bold.append(line.weight == 'bold')
+        page_lines.line_period.append(line.text.endswith('.'))
+    return page_lines
+
+
+def random_pages(pages: int, seed: int) -> Iterator[Tuple[str, PageLines, FontStatistics, str]]:
+    rng = random.Random(seed)
+    for page_num in range(pages):
+        records = []
+        for _ in range(rng.randint(0, LINES_PER_PAGE)):
+            size = rng.choice(SIZES) + rng.choice((0.0, 0.0, 0.25))
+            bold = rng.random() < 0.2
+            records.append(LineRecord(random_text(rng), size, size, 16 if bold else 0,
+                                      "Helvetica-Bold" if bold else "Helvetica", 'bold' if bold else 'normal'))
+        font_stats = FontStatistics()
+        for _ in range(rng.randint(0, 30)):
+            font_stats.add(rng.choice(SIZES), rng.randint(3, 400))
+        font_stats.finalize()
+        yield f"random page {page_num}", make_page(records), font_stats, rng.choice(SUPPORTED_LANGUAGES)
+
+
+def corpus_pages(input_dir: Path) -> Iterator[Tuple[str, PageLines, FontStatistics, str]]:
+    for pdf_path in sorted(input_dir.glob("*.pdf")):
+        extractor = outline.PDFOutlineExtractor(max_seconds=0, max_pages=0)
+        try:
+            with closing(extractor.iter_outline(str(pdf_path))) as items:
+                for kind, _ in items:
+                    if kind == "title":  # structure analysis is done; keep the document open
+                        break
+                else:
+                    continue
+                for page_num in range(len(extractor.doc)):
+                    yield (f"{pdf_path.name} page {page_num + 1}", extractor.layout.lines(page_num),
+                           extractor.font_stats, extractor.language)
+        except Exception as e:
+            print(f"skipping {pdf_path.name}: {e}", file=sys.stderr)
+
+
+def score(page_lines: PageLines, font_stats: FontStatistics, language: str,
+          vectorized: bool) -> Tuple[List[Dict], Dict[str, int]]:
+    """Headings and rule counters of one page through one of the two scoring paths."""
+    extractor = outline.PDFOutlineExtractor()
+    extractor.layout = StoredLayout({0: page_lines})
+    extractor.font_stats = font_stats
+    extractor.avg_font_size = font_stats.avg_font_size or 12
+    extractor.language = language
+    extractor.metrics = Instrumentation()
+    outline._score_page = None if vectorized else False
+    headings = extractor._extract_page_headings(0)
+    counters = {name: count for name, count in extractor.metrics.counters.items() if name.startswith("rule.")}
+    return headings, counters
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Compare NumPy heading scoring with the per-line fallback")
+    parser.add_argument("--pages", type=int, default=2000, help="randomized pages to compare")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-corpus", action="store_true", help=f"skip the PDFs in {INPUT_DIR}")
+    args = parser.parse_args(argv)
+
+    sources = [random_pages(args.pages, args.seed)]
+    if not args.no_corpus:
+        sources.append(corpus_pages(Path(INPUT_DIR)))
+
+    checked = failures = 0
+    for source in sources:
+        for name, page_lines, font_stats, language in source:
+            expected = score(page_lines, font_stats, language, vectorized=False)
+            actual = score(page_lines, font_stats, language, vectorized=True)
+            checked += 1
+            if actual != expected:
+                failures += 1
+                if failures <= 5:
+                    print(f"FAIL: {name} ({language}): score_page gave {actual}, "
+                          f"the per-line path gave {expected}", file=sys.stderr)
+    outline._score_page = None
+
+    print(f"scoring: {checked} pages compared, {failures} mismatches")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Guard against start-up regressions of the CLI entry point.
+
+Imports ``main`` under ``python -X importtime`` in a fresh interpreter and
+fails if the import takes longer than STARTUP_IMPORT_BUDGET_MS (best of
+several runs) or pulls in a module that should only load on first use.
+
+    python check_startup.py
+"""
+
+import os
+import subprocess
+import sys
+from typing import Dict, Tuple
+
+from config import STARTUP_IMPORT_BUDGET_MS
+
+# Heavy modules that must stay lazy.
+DEFERRED_MODULES = ('fitz', 'numpy', 'langdetect', 'pdfplumber', 'concurrent.futures.process')
+RUNS = 5
+
+
+def measure_import(module: str = 'main') -> Tuple[float, Dict[str, int]]:
+    """Return (total import ms of ``module``, cumulative us per imported module)."""
+    src_dir = os.path.dirname(os.path.abspath(__file__))
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=src_dir, capture_output=True, text=True, check=True,
+    )
+    cumulative = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cum_us, name = (part.strip() for part in line[len('import time:'):].split('|'))
+        cumulative[name] = int(cum_us)
+    return cumulative.get(module, 0) / 1000, cumulative
+
+
+def main() -> int:
+    timings = []
+    imported = {}
+    for _ in range(RUNS):
+        total_ms, imported = measure_import()
+        timings.append(total_ms)
+    best = min(timings)
+
+    failures = []
+    if best > STARTUP_IMPORT_BUDGET_MS:
+        failures.append(f"import main took {best:.1f}ms, budget is {STARTUP_IMPORT_BUDGET_MS}ms")
+    for module in DEFERRED_MODULES:
+        if module in imported:
+            failures.append(f"{module} is imported at start-up ({imported[module] / 1000:.1f}ms)")
+
+    print(f"import main: best {best:.1f}ms of {RUNS} runs (budget {STARTUP_IMPORT_BUDGET_MS}ms)")
+    for failure in failures:
+        print(f"FAIL: {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -34,6 +34,16 @@ HEADING_PATTERNS={
         r'^第[0-9]+章\s*',
         r'^[一二三四五六七八九十百千万]+[、．]\s*',
     ],
+    'levels':{
+        'H1':[r'^\d+\.\s+'],
+        'H2':[r'^\d+\.\d+\.\s+'],
+        'H3':[r'^\d+\.\d+\.\d+\.\s+'],
+    },
+    'japanese_levels':{
+        'H1':[r'^第[一二三四五六七八九十百千万]+章'],
+        'H2':[r'^第[一二三四五六七八九十百千万]+節'],
+        'H3':[r'^第[一二三四五六七八九十百千万]+項'],
+    },
     'keywords':{
         'en':['chapter','section','introduction','conclusion','abstract', 'summary','overview','background'],
         'ja':['章','節','項','序論','結論','概要','背景','まとめ'],
@@ -47,12 +57,19 @@ HEADING_PATTERNS={
     }
 }
 
+# Per-document budgets: heading extraction stops after this many pages or
+# seconds and the partial outline is marked "truncated".
 MAX_PAGES_TO_ANALYZE=50
-MAX_PROCESSING_TIME=10  
+MAX_PROCESSING_TIME=10
 MIN_HEADING_LENGTH=2
 MAX_HEADING_LENGTH=200
 MIN_TITLE_LENGTH=3
 LANGUAGE_DETECTION_SAMPLE_SIZE=1000
+# Fixed langdetect seed so the same document always gets the same language.
+LANGUAGE_DETECTION_SEED=0
+# Share of script characters (kana/Han, Hangul, Arabic, Cyrillic) above which
+# the language is decided without running langdetect.
+SCRIPT_SHORTCUT_RATIO=0.3
 
 SUPPORTED_LANGUAGES=[
     'en','ja','zh','ko','es','fr','de','ar','ru','it','pt','nl','sv','da','no'
@@ -61,4 +78,87 @@ SUPPORTED_LANGUAGES=[
 MIN_FONT_SIZE_DIFFERENCE=0.5
 BOLD_FONT_FLAG=16  
 JSON_INDENT=2
-JSON_ENSURE_ASCII=False
\ No newline at end of file
+JSON_ENSURE_ASCII=False
+
+# Pages kept in the per-document layout cache (LRU). The triage probes and font
+# samples are pinned outside this limit until the heading scan reaches them,
+# so each page within the scanned range is still laid out once.
+LAYOUT_CACHE_PAGES=8
+
+# Opt-in page-parallel heading scan (--page-workers): scans of at least
+# PAGE_PARALLEL_MIN_PAGES pages are split into chunks of PAGE_CHUNK_SIZE pages.
+# The scan is capped by MAX_PAGES_TO_ANALYZE first, so it only goes parallel
+# when --max-pages is 0 or at least PAGE_PARALLEL_MIN_PAGES.
+# Under a time budget, chunks shrink so one takes at most PAGE_CHUNK_BUDGET_SHARE
+# of the remaining time (per-page cost estimated from the pages laid out so far).
+PAGE_PARALLEL_MIN_PAGES=100
+PAGE_CHUNK_SIZE=50
+PAGE_CHUNK_BUDGET_SHARE=0.25
+
+# Upper bound on entries kept by the --cache-dir result cache (LRU eviction).
+# Once passed, the oldest entries are dropped in one batch down to this share.
+RESULT_CACHE_MAX_ENTRIES=10000
+RESULT_CACHE_EVICT_TO=0.9
+
+# Manifest written to OUTPUT_DIR by --incremental runs.
+SYNC_MANIFEST_NAME=".sync-manifest.json"
+
+# --watch daemon: seconds between scans without inotify, how long a file must
+# be unmodified before polling picks it up, and the bound on queued documents.
+WATCH_POLL_INTERVAL=1.0
+WATCH_SETTLE_SECONDS=0.5
+WATCH_MAX_PENDING=32
+
+# Local extraction service (server.py).
+SERVER_HOST="127.0.0.1"
+SERVER_PORT=8080
+SERVER_REQUEST_TIMEOUT=30
+SERVER_MAX_BODY_BYTES=200*1024*1024
+
+# Batch workers still busy on one file after WATCHDOG_TIMEOUT seconds are
+# killed; jobs caught in a crash that was not a timeout are retried this often.
+WATCHDOG_TIMEOUT=60
+WATCHDOG_MAX_RETRIES=2
+
+# Embedded bookmarks (doc.get_toc()) are used as the outline when at least
+# TOC_MIN_VALID_RATIO of entries point at real pages and TOC_SPOT_CHECKS
+# sampled entries are found in the text of their target page.
+TOC_SPOT_CHECKS=2
+TOC_MIN_VALID_RATIO=0.9
+
+# --low-memory: pages kept laid out at once and how often MuPDF's resource
+# store is emptied while scanning. MAX_RSS_MB (0: off) is the resident size at
+# which a document is cut short with a "memory" truncation marker.
+LOW_MEMORY_LAYOUT_PAGES=2
+LOW_MEMORY_WINDOW_PAGES=64
+MAX_RSS_MB=0
+
+# Font statistics and the language sample come from FONT_SAMPLE_PAGES pages
+# spread evenly across the document, reading at most FONT_SAMPLE_MAX_SPANS
+# spans (split evenly between the pages) and FONT_SAMPLE_MAX_CHARS characters.
+FONT_SAMPLE_PAGES=12
+FONT_SAMPLE_MAX_SPANS=6000
+FONT_SAMPLE_MAX_CHARS=200000
+
+# Triage lays out TRIAGE_PROBE_PAGES pages spread across each document and
+# skips it (image_only / no_text) only if they hold no text at all.
+TRIAGE_PROBE_PAGES=3
+
+# --save-lines writes each document's line tables next to its output under
+# this suffix; --reclassify re-runs detection on a directory of them.
+LINE_TABLES_SUFFIX=".lines.npz"
+
+# aio.AsyncExtractor admits this many documents per worker before callers wait.
+ASYNC_QUEUE_PER_WORKER=2
+
+# --index-db commits this many documents per SQLite transaction.
+INDEX_BATCH_SIZE=500
+
+# check_startup.py fails if "import main" takes longer than this.
+STARTUP_IMPORT_BUDGET_MS=150
+
+# bench.py: page counts of the synthetic documents, the share of their lines
+# that are headings, and the slowdown against a baseline reported as a regression.
+BENCH_SYNTHETIC_PAGES=(10, 100, 1000)
+BENCH_HEADING_DENSITY=0.1
+BENCH_REGRESSION_TOLERANCE=0.10
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Watch-folder daemon: keeps warm extractor workers and processes PDFs as they land.
+"""
+
+import argparse
+import signal
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+from budget import WorkerWatchdog
+from config import WATCH_MAX_PENDING, WATCH_POLL_INTERVAL, WATCH_SETTLE_SECONDS, WATCHDOG_MAX_RETRIES
+from sync import SyncManifest
+
+try:
+    from inotify_simple import INotify, flags as inotify_flags
+except ImportError:  # polling fallback
+    INotify = None
+
+
+class FolderWatcher:
+    """Wait for PDFs to appear in a directory using inotify, or polling without it."""
+
+    def __init__(self, input_dir: Path, poll_interval: float = WATCH_POLL_INTERVAL):
+        self.input_dir = input_dir
+        self.poll_interval = poll_interval
+        self._inotify = None
+        if INotify is not None:
+            self._inotify = INotify()
+            self._inotify.add_watch(str(input_dir), inotify_flags.CLOSE_WRITE | inotify_flags.MOVED_TO)
+
+    @property
+    def mode(self) -> str:
+        return "inotify" if self._inotify else "polling"
+
+    def wait(self, timeout: float) -> Set[str]:
+        """Block up to ``timeout`` seconds; return names known to be fully written."""
+        if self._inotify is None:
+            time.sleep(timeout)
+            return set()
+        events = self._inotify.read(timeout=int(timeout * 1000))
+        return {event.name for event in events if event.name.lower().endswith('.pdf')}
+
+    def close(self):
+        if self._inotify is not None:
+            self._inotify.close()
+
+
+def _is_settled(pdf_file: Path) -> bool:
+    """Polling cannot see close events, so wait until the file stops changing."""
+    try:
+        return time.time() - pdf_file.stat().st_mtime >= WATCH_SETTLE_SECONDS
+    except OSError:
+        return False
+
+
+def _mtime(pdf_file: Path) -> float:
+    try:
+        return pdf_file.stat().st_mtime
+    except OSError:
+        return 0.0
+
+
+def _ping() -> bool:
+    return True
+
+
+def _start_pool(args: argparse.Namespace, workers: int) -> ProcessPoolExecutor:
+    import main
+
+    pool = ProcessPoolExecutor(max_workers=workers, initializer=main._init_warm_worker, initargs=(args,))
+    wait([pool.submit(_ping) for _ in range(workers)])
+    return pool
+
+
+def run_daemon(args: argparse.Namespace, input_dir: Path, output_dir: Path):
+    """Process PDFs landing in ``input_dir`` until interrupted.
+
+    The folder is re-planned (globbed and checked against the manifest) only
+    when the watcher reports new files, a poll interval has passed or a
+    backlog is waiting for free workers; in between, the loop only collects
+    finished jobs. A worker still busy on one file after ``args.watchdog``
+    seconds is killed and the pool is rebuilt.
+    """
+    import main
+
+    workers = max(1, args.workers)
+    max_pending = max(workers, WATCH_MAX_PENDING)
+    manifest = SyncManifest(str(output_dir))
+    watcher = FolderWatcher(input_dir, args.poll_interval)
+    watchdog = WorkerWatchdog(args.watchdog) if args.watchdog else None
+    inflight: Dict = {}
+    failed: Dict[str, float] = {}
+    crashes: Dict[str, int] = {}
+    ready: Set[str] = set()
+    stopping = []
+    index = None
+    if args.index_db:
+        from heading_index import HeadingIndex
+        index = HeadingIndex(args.index_db)
+
+    def request_stop(signum, frame):
+        stopping.append(signum)
+
+    signal.signal(signal.SIGTERM, request_stop)
+    print(f"Watching {input_dir} ({watcher.mode}, {workers} workers)", file=sys.stderr)
+
+    pool = _start_pool(args, workers)
+    rescan = True
+    next_scan = 0.0
+    try:
+        while not stopping:
+            broken = _collect(inflight, manifest, failed, index, block=len(inflight) >= max_pending)
+            if broken:
+                broken += _collect(inflight, manifest, failed, index, block=False, drain=True)
+                _handle_break(broken, watchdog, failed, crashes, index)
+                pool.shutdown(wait=False)
+                pool = _start_pool(args, workers)
+                rescan = True
+            if len(inflight) >= max_pending:
+                continue  # backpressure: stop picking up files until a slot frees
+
+            now = time.monotonic()
+            if rescan or now >= next_scan:
+                rescan = False
+                next_scan = now + args.poll_interval
+                pdf_files = sorted(input_dir.glob("*.pdf"))
+                changed, removed = manifest.plan(pdf_files)
+                for name in removed:
+                    manifest.remove(name)
+                    if index:
+                        index.remove(Path(name).stem)
+                if removed and index:
+                    index.flush()
+
+                queued = {src.name for src, _ in inflight.values()}
+                for pdf_file in changed:
+                    if len(inflight) >= max_pending:
+                        rescan = True  # the rest waits for a free slot, not for the next poll
+                        break
+                    if pdf_file.name in queued or failed.get(pdf_file.name) == _mtime(pdf_file):
+                        continue
+                    if pdf_file.name not in ready and not _is_settled(pdf_file):
+                        continue
+                    ready.discard(pdf_file.name)
+                    output_file = output_dir / f"{pdf_file.stem}.json"
+                    future = pool.submit(main._process_in_worker, str(pdf_file), str(output_file), watchdog)
+                    inflight[future] = (pdf_file, output_file)
+                # only files still waiting for a slot need to stay marked as written
+                ready &= {pdf_file.name for pdf_file in changed}
+
+            if inflight:
+                timeout = min(args.poll_interval, 0.05)
+            else:
+                timeout = max(0.0, next_scan - time.monotonic())
+            events = watcher.wait(timeout)
+            if events:
+                ready |= events
+                rescan = True
+    except KeyboardInterrupt:
+        pass
+    finally:
+        broken = _collect(inflight, manifest, failed, index, block=False, drain=True)
+        if broken:
+            _handle_break(broken, watchdog, failed, crashes, index)
+        pool.shutdown()
+        manifest.save()
+        watcher.close()
+        if index:
+            index.close()
+        if watchdog:
+            watchdog.close()
+
+
+def _handle_break(broken: List[Tuple[Path, Path]], watchdog: Optional[WorkerWatchdog],
+                  failed: Dict[str, float], crashes: Dict[str, int], index):
+    """Decide which jobs of a broken pool failed; the others are picked up again by the next scan.
+
+    Mirrors main.run_jobs: the job the watchdog killed fails, and jobs caught
+    in a crash without a hung job fail after WATCHDOG_MAX_RETRIES retries.
+    """
+    hung, running = watchdog.inspect_break() if watchdog else (set(), set())
+    for pdf_file, output_file in broken:
+        error = None
+        if str(pdf_file) in hung:
+            error = f"killed by watchdog after {watchdog.seconds}s"
+        elif not hung and (str(pdf_file) in running or not watchdog):
+            crashes[pdf_file.name] = crashes.get(pdf_file.name, 0) + 1
+            if crashes[pdf_file.name] > WATCHDOG_MAX_RETRIES:
+                error = "worker process crashed"
+        if error:
+            print(f"Error processing {pdf_file}: {error}", file=sys.stderr)
+            failed[pdf_file.name] = _mtime(pdf_file)
+            crashes.pop(pdf_file.name, None)
+            if index:
+                index.add(output_file.stem, None, error)
+    if index:
+        index.flush()
+
+
+def _collect(inflight: Dict, manifest: SyncManifest, failed: Dict[str, float], index,
+             block: bool, drain: bool = False) -> List[Tuple[Path, Path]]:
+    """Record finished jobs; optionally wait for one (or all) to finish.
+
+    Failed files are remembered by mtime so they are retried only once modified.
+    With a HeadingIndex, finished jobs are indexed and committed right away.
+    Returns the (pdf, output) pairs of jobs lost to a broken pool.
+    """
+    broken = []
+    if not inflight:
+        return broken
+    if drain:
+        done, _ = wait(list(inflight))
+    elif block:
+        done, _ = wait(list(inflight), return_when=FIRST_COMPLETED)
+    else:
+        done = [future for future in inflight if future.done()]
+
+    for future in done:
+        pdf_file, output_file = inflight.pop(future)
+        try:
+            result, _ = future.result()
+        except BrokenProcessPool:
+            broken.append((pdf_file, output_file))
+        except Exception as e:
+            print(f"Error processing {pdf_file}: {str(e)}", file=sys.stderr)
+            failed[pdf_file.name] = _mtime(pdf_file)
+            if index:
+                index.add(output_file.stem, None, str(e))
+        else:
+            failed.pop(pdf_file.name, None)
+            manifest.record(str(pdf_file), str(output_file))
+            if index:
+                index.add(output_file.stem, result)
+    if index:
+        index.flush()
+    return broken
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Document-level font statistics used for heading detection.
+"""
+
+from bisect import bisect_right
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+def sample_pages(page_count: int, samples: int) -> List[int]:
+    """Pick the middle page of each of ``samples`` equal slices of the document.
+
+    Documents with no more than ``samples`` pages are read in full, so the
+    choice is deterministic and spreads evenly from cover to appendix.
+    """
+    if page_count <= samples:
+        return list(range(page_count))
+    return [(2 * index + 1) * page_count // (2 * samples) for index in range(samples)]
+
+
+class FontStatistics:
+    """Font-size histogram and size-to-level lookup for one document.
+
+    Built once per document; ``level_for_size`` then ranks a line's font size
+    with a bisect over the two largest sizes instead of re-sorting the size
+    list for every heading candidate.
+    """
+
+    def __init__(self):
+        self.histogram: Dict[float, int] = {}
+        self.span_count = 0
+        self.size_total = 0.0
+        self.sizes: List[float] = []
+        self._thresholds: List[float] = []
+        self._levels: List[str] = ["H1"]
+
+    @classmethod
+    def from_sizes(cls, font_sizes: Iterable[float]) -> "FontStatistics":
+        """Build statistics from a plain list of span font sizes."""
+        stats = cls()
+        for size in font_sizes:
+            stats.add(size, 1)
+        return stats.finalize()
+
+    def add(self, size: float, chars: int):
+        """Record one span of ``chars`` characters set at ``size``."""
+        self.histogram[size] = self.histogram.get(size, 0) + chars
+        self.span_count += 1
+        self.size_total += size
+
+    def finalize(self) -> "FontStatistics":
+        """Freeze the histogram into the sorted size list and level table."""
+        self.sizes = sorted(self.histogram, reverse=True)
+        if len(self.sizes) >= 3:
+            self._thresholds = [self.sizes[1], self.sizes[0]]
+            self._levels = ["H3", "H2", "H1"]
+        elif len(self.sizes) == 2:
+            self._thresholds = [self.sizes[0]]
+            self._levels = ["H2", "H1"]
+        else:
+            self._thresholds = []
+            self._levels = ["H1"]
+        return self
+
+    @property
+    def avg_font_size(self) -> Optional[float]:
+        """Mean font size over all recorded spans."""
+        if not self.span_count:
+            return None
+        return self.size_total / self.span_count
+
+    @property
+    def body_size(self) -> Optional[float]:
+        """Most common font size by character count (the body text size)."""
+        if not self.histogram:
+            return None
+        return max(self.histogram, key=lambda size: (self.histogram[size], -size))
+
+    def __len__(self) -> int:
+        return len(self.sizes)
+
+    def level_for_size(self, size: float) -> str:
+        """Return the heading level implied by a font size."""
+        return self._levels[bisect_right(self._thresholds, size)]
+
+    def level_table(self) -> Tuple[List[float], List[str]]:
+        """Return (ascending thresholds, levels) so that the level of a size is
+        ``levels[bisect_right(thresholds, size)]``."""
+        return self._thresholds, self._levels
+
+    def to_dict(self) -> Dict:
+        """Serialize to a JSON-compatible dict."""
+        return {
+            "histogram": [[size, chars] for size, chars in self.histogram.items()],
+            "span_count": self.span_count,
+            "size_total": self.size_total,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "FontStatistics":
+        """Rebuild statistics serialized with ``to_dict``."""
+        stats = cls()
+        stats.histogram = {size: chars for size, chars in data["histogram"]}
+        stats.span_count = data["span_count"]
+        stats.size_total = data["size_total"]
+        return stats.finalize()
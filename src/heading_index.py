@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+Corpus-wide heading index in SQLite with FTS5 full-text search.
+
+    python main.py --index-db headings.db                 # fill it from a batch run
+    python heading_index.py headings.db "climate policy"  # search it
+    python heading_index.py headings.db "intro*" --level H1 --limit 5
+
+Each document is one ``documents`` row (keyed by its output name) and its
+title and outline are ``headings`` rows (document, level, text, page) mirrored
+by triggers into two FTS5 tables: a word index (unicode61) for FTS5 queries,
+and a trigram index that serves queries in scripts written without spaces
+(Japanese, Chinese, Korean) as substring matches. Writes are buffered and
+committed INDEX_BATCH_SIZE documents per transaction.
+"""
+
+import argparse
+import json
+import re
+import sqlite3
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+from config import INDEX_BATCH_SIZE
+from language import SCRIPT_PATTERNS
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    title TEXT,
+    error TEXT,
+    skipped TEXT,
+    indexed_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS headings (
+    id INTEGER PRIMARY KEY,
+    doc_id INTEGER NOT NULL REFERENCES documents(id) ON DELETE CASCADE,
+    level TEXT NOT NULL,
+    text TEXT NOT NULL,
+    page INTEGER
+);
+CREATE INDEX IF NOT EXISTS headings_doc ON headings(doc_id);
+CREATE VIRTUAL TABLE IF NOT EXISTS headings_fts USING fts5(
+    text, content='headings', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS headings_trigram USING fts5(
+    text, content='headings', content_rowid='id', tokenize='trigram'
+);
+CREATE TRIGGER IF NOT EXISTS headings_ai AFTER INSERT ON headings BEGIN
+    INSERT INTO headings_fts(rowid, text) VALUES (new.id, new.text);
+    INSERT INTO headings_trigram(rowid, text) VALUES (new.id, new.text);
+END;
+CREATE TRIGGER IF NOT EXISTS headings_ad AFTER DELETE ON headings BEGIN
+    INSERT INTO headings_fts(headings_fts, rowid, text) VALUES ('delete', old.id, old.text);
+    INSERT INTO headings_trigram(headings_trigram, rowid, text) VALUES ('delete', old.id, old.text);
+END;
+"""
+
+# Level stored for a document's title row
+TITLE_LEVEL = "title"
+
+_UNSPACED_SCRIPTS = ('kana', 'han', 'hangul')
+
+
+def is_unspaced_query(query: str) -> bool:
+    """True for queries in scripts unicode61 cannot split into words."""
+    return any(SCRIPT_PATTERNS[script].search(query) for script in _UNSPACED_SCRIPTS)
+
+
+def _escape_like(term: str) -> str:
+    """Escape LIKE wildcards so a term matches literally under ESCAPE '\\'."""
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+class HeadingIndex:
+    """Buffered writer and query interface for the SQLite heading index."""
+
+    def __init__(self, db_path: str, batch_size: int = INDEX_BATCH_SIZE):
+        self.db_path = db_path
+        self.batch_size = max(1, batch_size)
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA foreign_keys=ON")
+        has_trigram = self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'headings_trigram'").fetchone() is not None
+        # an index written before the trigram table existed gets the new triggers
+        upgrade = "" if has_trigram else "DROP TRIGGER IF EXISTS headings_ai; DROP TRIGGER IF EXISTS headings_ad;"
+        try:
+            self.conn.executescript(upgrade + SCHEMA)
+        except sqlite3.OperationalError as e:
+            self.conn.close()
+            raise RuntimeError(f"cannot create heading index (SQLite needs FTS5 with the trigram "
+                               f"tokenizer, 3.34+): {e}") from e
+        if not has_trigram:
+            with self.conn:
+                self.conn.execute("INSERT INTO headings_trigram(headings_trigram) VALUES ('rebuild')")
+        # name -> (result, error) to write, or None to remove; the last change wins
+        self._pending: Dict[str, Optional[Tuple[Optional[Dict], Optional[str]]]] = {}
+
+    def add(self, name: str, result: Optional[Dict], error: Optional[str] = None):
+        """Queue one document's outline (or failure), replacing any earlier entry."""
+        self._queue(name, (result, error))
+
+    def remove(self, name: str):
+        """Queue the removal of a document and its headings."""
+        self._queue(name, None)
+
+    def _queue(self, name: str, change):
+        self._pending.pop(name, None)
+        self._pending[name] = change
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """Write every queued change in a single transaction."""
+        if not self._pending:
+            return
+        now = time.time()
+        with self.conn:
+            self.conn.executemany("DELETE FROM documents WHERE name = ?", [(name,) for name in self._pending])
+            rows = []
+            for name, change in self._pending.items():
+                if change is None:
+                    continue
+                result, error = change
+                result = result or {}
+                skipped = result.get("skipped")
+                cursor = self.conn.execute(
+                    "INSERT INTO documents (name, title, error, skipped, indexed_at) VALUES (?, ?, ?, ?, ?)",
+                    (name, result.get("title"), error or result.get("error"),
+                     skipped["reason"] if skipped else None, now))
+                doc_id = cursor.lastrowid
+                title = result.get("title")
+                if title and title != "Unknown":
+                    rows.append((doc_id, TITLE_LEVEL, title, None))
+                rows.extend((doc_id, heading["level"], heading["text"], heading["page"])
+                            for heading in result.get("outline", ()))
+            self.conn.executemany("INSERT INTO headings (doc_id, level, text, page) VALUES (?, ?, ?, ?)", rows)
+        self._pending.clear()
+
+    def search(self, query: str, level: Optional[str] = None, limit: int = 20) -> List[Dict]:
+        """Return the best-matching headings for a query, most relevant first.
+
+        Queries containing kana, Han or Hangul are split on whitespace and
+        every term must occur as a substring (shortest headings first); other
+        queries use FTS5 syntax ranked by bm25.
+        """
+        select = ("SELECT d.name, d.title, h.level, h.text, h.page FROM {table} f "
+                  "JOIN headings h ON h.id = f.rowid JOIN documents d ON d.id = h.doc_id ")
+        if is_unspaced_query(query):
+            # the trigram index only serves patterns with a 3+ character run free
+            # of wildcards and drops out under ESCAPE, so it narrows with the raw
+            # pattern (% and _ only widen it) and the escaped pattern on h.text
+            # keeps each term literal
+            sql = select.format(table="headings_trigram") + "WHERE 1"
+            params: list = []
+            for term in query.split():
+                if max(map(len, re.split(r"[%_]", term))) >= 3:
+                    sql += " AND f.text LIKE ?"
+                    params.append(f"%{term}%")
+                sql += " AND h.text LIKE ? ESCAPE '\\'"
+                params.append("%" + _escape_like(term) + "%")
+            order = " ORDER BY length(h.text), h.id LIMIT ?"
+        else:
+            sql = select.format(table="headings_fts") + "WHERE headings_fts MATCH ?"
+            params = [query]
+            order = " ORDER BY f.rank LIMIT ?"
+        if level:
+            sql += " AND h.level = ?"
+            params.append(level)
+        sql += order
+        params.append(limit)
+        return [{"document": name, "title": title, "level": heading_level, "text": text, "page": page}
+                for name, title, heading_level, text, page in self.conn.execute(sql, params)]
+
+    def stats(self) -> Dict:
+        documents, = self.conn.execute("SELECT COUNT(*) FROM documents").fetchone()
+        headings, = self.conn.execute("SELECT COUNT(*) FROM headings").fetchone()
+        return {"documents": documents, "headings": headings}
+
+    def close(self):
+        try:
+            self.flush()
+        finally:
+            self.conn.close()
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Search the heading index built with main.py --index-db")
+    parser.add_argument("db", help="SQLite database written by --index-db")
+    parser.add_argument("query", nargs="?", default=None,
+                        help="FTS5 query, e.g. 'climate AND policy' or 'intro*', or Japanese/Chinese/Korean "
+                             "terms matched as substrings (omit for index stats)")
+    parser.add_argument("--level", default=None, help="only headings of this level (H1, H2, H3, title)")
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--json", action="store_true", help="print matches as JSON lines")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    index = HeadingIndex(args.db)
+    try:
+        if args.query is None:
+            print(json.dumps(index.stats()))
+            return 0
+        try:
+            matches = index.search(args.query, args.level, args.limit)
+        except sqlite3.OperationalError as e:
+            print(f"Invalid query {args.query!r}: {e}", file=sys.stderr)
+            return 2
+    finally:
+        index.close()
+
+    for match in matches:
+        if args.json:
+            print(json.dumps(match, ensure_ascii=False))
+        else:
+            page = f"p.{match['page']}" if match['page'] else "-"
+            print(f"{match['document']}\t{page}\t{match['level']}\t{match['text']}")
+    return 0 if matches else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
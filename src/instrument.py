@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Opt-in stage timers, hot-path counters and profiler wrappers.
+
+Nothing here runs unless an extractor is created with ``instrument=True`` or
+a profiler is requested, so the default path only pays for a None check.
+"""
+
+import os
+import time
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from typing import Callable, Dict, Optional
+
+PROFILE_MODES = ('cprofile', 'tracemalloc')
+TRACEMALLOC_TOP_LINES = 30
+
+
+class Instrumentation:
+    """Wall time per extraction stage plus named event counters for one document."""
+
+    def __init__(self):
+        self.stages: Dict[str, float] = {}
+        self.counters = Counter()
+
+    @contextmanager
+    def stage(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + time.perf_counter() - started
+
+    def count(self, name: str, n: int = 1):
+        self.counters[name] += n
+
+    def report(self) -> Dict:
+        return {
+            "stages": {name: round(seconds, 6) for name, seconds in self.stages.items()},
+            "counters": dict(sorted(self.counters.items())),
+        }
+
+
+def stage(metrics: Optional[Instrumentation], name: str):
+    """Return a timer for ``name``, or a no-op context when instrumentation is off."""
+    return metrics.stage(name) if metrics is not None else nullcontext()
+
+
+def artifact_path(output_path: str, suffix: str) -> str:
+    """Path next to an output JSON file, e.g. ``out/doc.json`` -> ``out/doc.metrics.json``."""
+    return os.path.splitext(output_path)[0] + suffix
+
+
+def run_profiled(mode: Optional[str], output_path: str, func: Callable, *args):
+    """Call ``func(*args)`` under cProfile or tracemalloc and dump the results next to ``output_path``.
+
+    cProfile writes ``<name>.prof`` (load it with ``pstats``); tracemalloc
+    writes ``<name>.tracemalloc.txt`` with the peak and the top allocation sites.
+    """
+    if mode is None:
+        return func(*args)
+    if mode == 'cprofile':
+        import cProfile
+
+        profiler = cProfile.Profile()
+        try:
+            return profiler.runcall(func, *args)
+        finally:
+            profiler.dump_stats(artifact_path(output_path, '.prof'))
+    if mode == 'tracemalloc':
+        import tracemalloc
+
+        tracemalloc.start(25)
+        try:
+            return func(*args)
+        finally:
+            snapshot = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            with open(artifact_path(output_path, '.tracemalloc.txt'), 'w', encoding='utf-8') as f:
+                f.write(f"current {current / 1024:.1f} KiB, peak {peak / 1024:.1f} KiB\n")
+                for stat in snapshot.statistics('lineno')[:TRACEMALLOC_TOP_LINES]:
+                    f.write(f"{stat}\n")
+    raise ValueError(f"unknown profile mode: {mode}")
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Document language identification.
+
+Scripts that identify a supported language on their own (kana, Hangul, Han,
+Arabic, Cyrillic) are decided from a character histogram; everything else
+goes to a seeded langdetect factory that only loads the profiles of
+SUPPORTED_LANGUAGES, on first use.
+"""
+
+import os
+import re
+from typing import Dict, Optional
+
+from config import (
+    LANGUAGE_DETECTION_SAMPLE_SIZE,
+    LANGUAGE_DETECTION_SEED,
+    SCRIPT_SHORTCUT_RATIO,
+    SUPPORTED_LANGUAGES,
+)
+
+SCRIPT_PATTERNS = {
+    'latin': re.compile(r'[a-zA-Z]'),
+    'kana': re.compile(r'[\u3040-\u309f\u30a0-\u30ff]'),
+    'han': re.compile(r'[\u4e00-\u9fff]'),
+    'hangul': re.compile(r'[\uac00-\ud7af\u1100-\u11ff]'),
+    'arabic': re.compile(r'[\u0600-\u06ff]'),
+    'cyrillic': re.compile(r'[\u0400-\u04ff]'),
+}
+
+# langdetect profile names folded onto the codes used by the heading rules
+_PROFILE_ALIASES = {'zh-cn': 'zh', 'zh-tw': 'zh'}
+
+_factory = None
+
+
+def script_histogram(text: str) -> Dict[str, int]:
+    """Count the characters of each script of interest in text."""
+    return {script: len(pattern.findall(text)) for script, pattern in SCRIPT_PATTERNS.items()}
+
+
+def language_from_scripts(histogram: Dict[str, int]) -> Optional[str]:
+    """Return the language implied by the dominant script, or None if undecided."""
+    letters = sum(histogram.values())
+    if not letters:
+        return None
+
+    def share(*scripts: str) -> float:
+        return sum(histogram[script] for script in scripts) / letters
+
+    if histogram['kana'] and share('kana', 'han') >= SCRIPT_SHORTCUT_RATIO:
+        return 'ja'
+    if share('hangul') >= SCRIPT_SHORTCUT_RATIO:
+        return 'ko'
+    if share('han') >= SCRIPT_SHORTCUT_RATIO:
+        return 'zh'
+    if share('arabic') >= SCRIPT_SHORTCUT_RATIO:
+        return 'ar'
+    if share('cyrillic') >= SCRIPT_SHORTCUT_RATIO:
+        return 'ru'
+    return None
+
+
+class LanguageSample:
+    """Collects at most ``budget`` characters of text for language detection."""
+
+    def __init__(self, budget: int = LANGUAGE_DETECTION_SAMPLE_SIZE):
+        self.budget = budget
+        self._parts = []
+        self._size = 0
+
+    @property
+    def full(self) -> bool:
+        return self._size >= self.budget
+
+    def add(self, text: str):
+        if self.full or not text:
+            return
+        text = text[:self.budget - self._size]
+        self._parts.append(text)
+        self._size += len(text)
+
+    def text(self) -> str:
+        return "".join(self._parts)
+
+
+def _get_factory():
+    global _factory
+    if _factory is None:
+        from langdetect.detector_factory import PROFILES_DIRECTORY, DetectorFactory
+
+        profiles = []
+        for name in sorted(os.listdir(PROFILES_DIRECTORY)):
+            if _PROFILE_ALIASES.get(name, name) in SUPPORTED_LANGUAGES:
+                with open(os.path.join(PROFILES_DIRECTORY, name), 'r', encoding='utf-8') as f:
+                    profiles.append(f.read())
+        factory = DetectorFactory()
+        factory.load_json_profile(profiles)
+        factory.seed = LANGUAGE_DETECTION_SEED
+        _factory = factory
+    return _factory
+
+
+def detect_language(text: str, default: str = 'en') -> str:
+    """Identify the language of a text sample, restricted to SUPPORTED_LANGUAGES."""
+    if not text.strip():
+        return default
+
+    language = language_from_scripts(script_histogram(text))
+    if language:
+        return language
+
+    from langdetect.lang_detect_exception import LangDetectException
+
+    try:
+        detector = _get_factory().create()
+        detector.append(text)
+        language = detector.detect()
+    except LangDetectException:
+        return default
+    return _PROFILE_ALIASES.get(language, language)
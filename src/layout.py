@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Compact per-page line tables and a per-document cache so each page is laid out once.
+"""
+
+from array import array
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional
+
+from config import BOLD_FONT_FLAG, LAYOUT_CACHE_PAGES
+
+
+def _text_flags() -> int:
+    """Default "dict" extraction flags minus image blocks, which are never read."""
+    import fitz
+
+    return fitz.TEXTFLAGS_DICT & ~fitz.TEXT_PRESERVE_IMAGES
+
+
+class LineRecord:
+    """One non-empty text line reduced to the fields the heuristics read.
+
+    ``text`` joins the line's stripped span texts with single spaces,
+    ``title_size`` is the largest size among spans carrying text, and the
+    remaining fields match ``utils.get_font_info``. ``get`` lets a record be
+    passed wherever a font-info dict is expected.
+    """
+
+    __slots__ = ('text', 'title_size', 'size', 'flags', 'font_name', 'weight')
+
+    def __init__(self, text: str, title_size: float, size: float, flags: int, font_name: str, weight: str):
+        self.text = text
+        self.title_size = title_size
+        self.size = size
+        self.flags = flags
+        self.font_name = font_name
+        self.weight = weight
+
+    def get(self, key: str, default=None):
+        return getattr(self, key, default) if key in self.__slots__ else default
+
+
+class PageLines:
+    """Line records of one page plus the span statistics used for structure analysis.
+
+    ``line_sizes``, ``line_lengths``, ``line_bold`` and ``line_period`` run
+    parallel to ``lines`` (font size, text length, bold flag, ends with '.')
+    so they can be scored as arrays. ``stat_sizes``/``stat_chars`` hold the
+    size and length of every span whose stripped text is longer than two
+    characters; ``sample`` is their text and ``span_count`` counts every span
+    visited.
+    """
+
+    __slots__ = ('lines', 'line_sizes', 'line_lengths', 'line_bold', 'line_period',
+                 'stat_sizes', 'stat_chars', 'sample', 'span_count')
+
+    def __init__(self):
+        self.lines: List[LineRecord] = []
+        self.line_sizes = array('d')
+        self.line_lengths = array('l')
+        self.line_bold = array('b')
+        self.line_period = array('b')
+        self.stat_sizes = array('d')
+        self.stat_chars = array('l')
+        self.sample = ""
+        self.span_count = 0
+
+
+def build_page_lines(page) -> PageLines:
+    """Lay out a page once and reduce it to a PageLines table."""
+    result = PageLines()
+    sample_parts = []
+    for block in page.get_text("dict", flags=_text_flags())["blocks"]:
+        for line in block.get("lines", ()):
+            parts = []
+            title_size = 0
+            size = 0
+            flags = 0
+            font_name = ''
+            weight = 'normal'
+            result.span_count += len(line["spans"])
+            for span in line["spans"]:
+                span_size = span["size"]
+                if span_size > size:
+                    size = span_size
+                    flags = span["flags"]
+                    font_name = span["font"]
+                    if flags & BOLD_FONT_FLAG:
+                        weight = 'bold'
+
+                text = span["text"].strip()
+                if text:
+                    parts.append(text)
+                    title_size = max(title_size, span_size)
+                    if len(text) > 2:
+                        result.stat_sizes.append(span_size)
+                        result.stat_chars.append(len(text))
+                        sample_parts.append(text)
+
+            if parts:
+                text = " ".join(parts)
+                result.lines.append(LineRecord(text, title_size, size, flags, font_name, weight))
+                result.line_sizes.append(size)
+                result.line_lengths.append(len(text))
+                result.line_bold.append(weight == 'bold')
+                result.line_period.append(text.endswith('.'))
+
+    if sample_parts:
+        result.sample = " ".join(sample_parts) + " "
+    return result
+
+
+class PageLayoutCache:
+    """Bounded LRU cache of PageLines tables for one document.
+
+    Structure analysis, title extraction and heading extraction all walk the
+    first pages of a document; keeping the most recent pages around means each
+    page is parsed exactly once, while the size limit keeps memory flat on
+    documents with thousands of pages. Pages read out of order ahead of the
+    heading scan (triage probes, font samples) can be ``pin``-ned so they stay
+    cached outside the limit until the scan ``unpin``-s them. When ``record``
+    is a dict, every table built is also kept there by page number, outside the
+    size limit.
+    """
+
+    def __init__(self, doc, max_pages: int = LAYOUT_CACHE_PAGES, record: Optional[Dict[int, PageLines]] = None):
+        self.doc = doc
+        self.record = record
+        self.max_pages = max(1, max_pages)
+        self.pages_parsed = 0
+        self.spans_visited = 0
+        self._pages = OrderedDict()
+        self._pinned: Dict[int, Optional[PageLines]] = {}
+
+    def pin(self, page_nums: Iterable[int]):
+        """Keep these pages cached, outside the size limit, until they are unpinned."""
+        for page_num in page_nums:
+            self._pinned.setdefault(page_num, self._pages.pop(page_num, None))
+
+    def unpin(self, page_num: int):
+        """Return a pinned page to the LRU once its last expected reader is done."""
+        page_lines = self._pinned.pop(page_num, None)
+        if page_lines is not None:
+            self._store(page_num, page_lines)
+
+    def lines(self, page_num: int) -> PageLines:
+        """Return the line table of a page, laying it out on first access."""
+        page_lines = self._pinned.get(page_num)
+        if page_lines is not None:
+            return page_lines
+        page_lines = self._pages.get(page_num)
+        if page_lines is not None:
+            self._pages.move_to_end(page_num)
+            return page_lines
+
+        page_lines = build_page_lines(self.doc[page_num])
+        self.pages_parsed += 1
+        self.spans_visited += page_lines.span_count
+        if self.record is not None:
+            self.record[page_num] = page_lines
+        if page_num in self._pinned:
+            self._pinned[page_num] = page_lines
+        else:
+            self._store(page_num, page_lines)
+        return page_lines
+
+    def _store(self, page_num: int, page_lines: PageLines):
+        self._pages[page_num] = page_lines
+        if len(self._pages) > self.max_pages:
+            self._pages.popitem(last=False)
+
+    def clear(self):
+        """Drop every cached page, pinned ones included."""
+        self._pages.clear()
+        self._pinned.clear()
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Columnar on-disk line tables, so heading rules can be re-run without fitz.
+
+A ``.lines.npz`` file holds every laid-out line of one document (page, text,
+sizes, flags, font, weight), the span statistics used for structure analysis
+and the bookmark tree, as flat NumPy columns with strings packed into UTF-8
+blobs. ``load_line_tables`` turns it back into stand-ins for the fitz document
+and the page layout cache that the extractor reads from.
+"""
+
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+
+from layout import LineRecord, PageLines
+
+FORMAT_VERSION = 1
+
+
+def _pack(strings: Iterable[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """Encode strings as one UTF-8 byte blob plus n+1 offsets."""
+    encoded = [text.encode('utf-8') for text in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    if encoded:
+        np.cumsum([len(item) for item in encoded], out=offsets[1:])
+    return np.frombuffer(b''.join(encoded), dtype=np.uint8), offsets
+
+
+def _unpack(blob: np.ndarray, offsets: np.ndarray) -> List[str]:
+    data = blob.tobytes()
+    bounds = offsets.tolist()
+    return [data[start:end].decode('utf-8') for start, end in zip(bounds, bounds[1:])]
+
+
+class StoredDocument:
+    """Stands in for a fitz document: page count and bookmarks only."""
+
+    needs_pass = False
+
+    def __init__(self, page_count: int, toc: List[list]):
+        self.page_count = page_count
+        self.toc = toc
+
+    def __len__(self) -> int:
+        return self.page_count
+
+    def get_toc(self, simple: bool = True) -> List[list]:
+        return [list(entry) for entry in self.toc]
+
+    def close(self):
+        pass
+
+
+class StoredLayout:
+    """Stands in for PageLayoutCache, serving tables loaded from a ``.lines.npz`` file."""
+
+    def __init__(self, pages: Dict[int, PageLines]):
+        self._pages = pages
+        self.pages_parsed = 0
+        self.spans_visited = 0
+
+    def lines(self, page_num: int) -> PageLines:
+        page_lines = self._pages.get(page_num)
+        if page_lines is None:
+            page_lines = self._pages[page_num] = PageLines()
+        return page_lines
+
+    def pin(self, page_nums):
+        pass
+
+    def unpin(self, page_num: int):
+        pass
+
+    def clear(self):
+        pass
+
+
+def save_line_tables(path: str, page_count: int, toc: List[list], pages: Dict[int, PageLines]):
+    """Write the line tables of one document to ``path`` as compressed columns."""
+    line_page, texts, title_sizes, sizes, flags, fonts, bold = [], [], [], [], [], [], []
+    stat_page, stat_sizes, stat_chars = [], [], []
+    sample_page, samples = [], []
+    font_ids: Dict[str, int] = {}
+
+    for page_num in sorted(pages):
+        page_lines = pages[page_num]
+        for line in page_lines.lines:
+            line_page.append(page_num)
+            texts.append(line.text)
+            title_sizes.append(line.title_size)
+            sizes.append(line.size)
+            flags.append(line.flags)
+            fonts.append(font_ids.setdefault(line.font_name, len(font_ids)))
+            bold.append(line.weight == 'bold')
+        stat_page.extend([page_num] * len(page_lines.stat_sizes))
+        stat_sizes.extend(page_lines.stat_sizes)
+        stat_chars.extend(page_lines.stat_chars)
+        sample_page.append(page_num)
+        samples.append(page_lines.sample)
+
+    text_blob, text_offsets = _pack(texts)
+    font_blob, font_offsets = _pack(font_ids)
+    sample_blob, sample_offsets = _pack(samples)
+    toc_blob, toc_offsets = _pack(title for _, title, _ in toc)
+    np.savez_compressed(
+        path,
+        version=np.int32(FORMAT_VERSION),
+        page_count=np.int32(page_count),
+        line_page=np.asarray(line_page, dtype=np.int32),
+        line_text=text_blob, line_text_offsets=text_offsets,
+        line_title_size=np.asarray(title_sizes, dtype=np.float64),
+        line_size=np.asarray(sizes, dtype=np.float64),
+        line_flags=np.asarray(flags, dtype=np.int32),
+        line_font=np.asarray(fonts, dtype=np.int32),
+        line_bold=np.asarray(bold, dtype=np.int8),
+        font_names=font_blob, font_names_offsets=font_offsets,
+        stat_page=np.asarray(stat_page, dtype=np.int32),
+        stat_size=np.asarray(stat_sizes, dtype=np.float64),
+        stat_chars=np.asarray(stat_chars, dtype=np.int64),
+        sample_page=np.asarray(sample_page, dtype=np.int32),
+        sample_text=sample_blob, sample_text_offsets=sample_offsets,
+        toc_level=np.asarray([level for level, _, _ in toc], dtype=np.int32),
+        toc_page=np.asarray([page for _, _, page in toc], dtype=np.int32),
+        toc_title=toc_blob, toc_title_offsets=toc_offsets,
+    )
+
+
+def load_line_tables(path: str) -> Tuple[StoredDocument, StoredLayout]:
+    """Read a ``.lines.npz`` file back into a document/layout pair for the extractor."""
+    with np.load(path, allow_pickle=False) as data:
+        if int(data['version']) != FORMAT_VERSION:
+            raise ValueError(f"unsupported line table version {int(data['version'])} in {path}")
+        columns = {name: data[name] for name in data.files}
+
+    pages: Dict[int, PageLines] = {}
+
+    def page(page_num: int) -> PageLines:
+        page_lines = pages.get(page_num)
+        if page_lines is None:
+            page_lines = pages[page_num] = PageLines()
+        return page_lines
+
+    texts = _unpack(columns['line_text'], columns['line_text_offsets'])
+    fonts = _unpack(columns['font_names'], columns['font_names_offsets'])
+    for page_num, text, title_size, size, flags, font, bold in zip(
+            columns['line_page'].tolist(), texts, columns['line_title_size'].tolist(),
+            columns['line_size'].tolist(), columns['line_flags'].tolist(),
+            columns['line_font'].tolist(), columns['line_bold'].tolist()):
+        page_lines = page(page_num)
+        page_lines.lines.append(LineRecord(text, title_size, size, flags, fonts[font],
+                                           'bold' if bold else 'normal'))
+        page_lines.line_sizes.append(size)
+        page_lines.line_lengths.append(len(text))
+        page_lines.line_bold.append(bold)
+        page_lines.line_period.append(text.endswith('.'))
+
+    for page_num, size, chars in zip(columns['stat_page'].tolist(), columns['stat_size'].tolist(),
+                                     columns['stat_chars'].tolist()):
+        page_lines = page(page_num)
+        page_lines.stat_sizes.append(size)
+        page_lines.stat_chars.append(chars)
+
+    samples = _unpack(columns['sample_text'], columns['sample_text_offsets'])
+    for page_num, sample in zip(columns['sample_page'].tolist(), samples):
+        page(page_num).sample = sample
+
+    toc_titles = _unpack(columns['toc_title'], columns['toc_title_offsets'])
+    toc = [[level, title, page_no] for level, title, page_no in zip(
+        columns['toc_level'].tolist(), toc_titles, columns['toc_page'].tolist())]
+    return StoredDocument(int(columns['page_count']), toc), StoredLayout(pages)
@@ -1,277 +1,284 @@
 #!/usr/bin/env python3
+# fitz, NumPy, langdetect and the process-pool machinery are imported on first
+# use so that short runs (cache hits, --help, service start-up) stay cheap.
+import argparse
 import os
-import json
 import sys
-import re
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, Iterator, List, Optional, Tuple
 
-import fitz 
-import pdfplumber
-from langdetect import detect
-from langdetect.lang_detect_exception import LangDetectException
-
-from utils import(
+from utils import (
+    CUE_REGEX_EVALUATIONS,
     detect_heading_level,
-    extract_title_from_text,
-    is_likely_heading,
-    normalize_text,
-    get_font_info
+    heading_decision,
+    normalize_text
 )
-
+from budget import ExtractionBudget, WorkerWatchdog
+from cache import ResultCache
+from font_stats import FontStatistics, sample_pages
+from instrument import PROFILE_MODES, Instrumentation, artifact_path, run_profiled, stage
+from language import LanguageSample, detect_language
+from layout import PageLayoutCache
+from sync import SyncManifest, write_json_atomic
+from triage import FAST, SKIP, open_failure, triage_document
 from config import(
     INPUT_DIR,
     OUTPUT_DIR,
-    HEADING_PATTERNS,
-    FONT_SIZE_THRESHOLDS,
-    MAX_TITLE_LENGTH
+    FONT_SAMPLE_MAX_CHARS,
+    FONT_SAMPLE_MAX_SPANS,
+    FONT_SAMPLE_PAGES,
+    LAYOUT_CACHE_PAGES,
+    LINE_TABLES_SUFFIX,
+    LOW_MEMORY_LAYOUT_PAGES,
+    LOW_MEMORY_WINDOW_PAGES,
+    MAX_RSS_MB,
+    MAX_PAGES_TO_ANALYZE,
+    MAX_PROCESSING_TIME,
+    MAX_TITLE_LENGTH,
+    PAGE_CHUNK_BUDGET_SHARE,
+    PAGE_CHUNK_SIZE,
+    PAGE_PARALLEL_MIN_PAGES,
+    TOC_MIN_VALID_RATIO,
+    TOC_SPOT_CHECKS,
+    TRIAGE_PROBE_PAGES,
+    WATCH_POLL_INTERVAL,
+    WATCHDOG_MAX_RETRIES,
+    WATCHDOG_TIMEOUT
 )
 
-class PDFOutlineExtractor:
-    def __init__(self):
-        self.doc=None
-        self.language='en'
-        self.font_sizes=[]
-        self.avg_font_size=12
+_score_page=None
 
-    def extract_outline(self,pdf_path: str)->Dict:
-        try:
-            self.doc=fitz.open(pdf_path)
-            self._analyze_document_structure()
-            title=self._extract_title()
-            outline=self._extract_headings()
-            return{
-                "title":title,
-                "outline":outline
-            }
-        except Exception as e:
-            print(f"Error processing {pdf_path}:{str(e)}",file=sys.stderr)
-            return {"title":"Unknown","outline":[]}
-        finally:
-            if self.doc:
-                self.doc.close()
-
-    def _analyze_document_structure(self):
-        font_sizes=[]
-        text_sample=""
-        max_pages=min(5,len(self.doc))
-
-        for page_num in range(max_pages):
-            page=self.doc[page_num]
-            blocks=page.get_text("dict")["blocks"]
-            for block in blocks:
-                if "lines" in block:
-                    for line in block["lines"]:
-                        for span in line["spans"]:
-                            font_size=span["size"]
-                            text=span["text"].strip()
-                            if text and len(text)>2:
-                                font_sizes.append(font_size)
-                                text_sample+=text + " "
-
-        if font_sizes:
-            self.font_sizes=sorted(set(font_sizes),reverse=True)
-            self.avg_font_size=sum(font_sizes)/len(font_sizes)
 
+def _load_scorer():
+    """Return scoring.score_page, or False when NumPy is not installed."""
+    global _score_page
+    if _score_page is None:
         try:
-            if text_sample.strip():
-                self.language=detect(text_sample[:1000])
-        except LangDetectException:
-            self.language='en'
-
-    def _extract_title(self)->str:
-        if not self.doc or len(self.doc)==0:
-            return "Unknown"
-
-        first_page=self.doc[0]
-        blocks=first_page.get_text("dict")["blocks"]
-        candidates=[]
-
-        for block in blocks:
-            if "lines" in block:
-                for line in block["lines"]:
-                    line_text=""
-                    max_font_size=0
-                    for span in line["spans"]:
-                        text=span["text"].strip()
-                        font_size=span["size"]
-                        if text:
-                            line_text+=text + " "
-                            max_font_size=max(max_font_size,font_size)
-
-                    line_text=line_text.strip()
-                    if (line_text and len(line_text)<=MAX_TITLE_LENGTH and
-                            len(line_text)>3 and max_font_size>self.avg_font_size*1.2):
-                        candidates.append((line_text,max_font_size,len(line_text)))
-
-        if candidates:
-            candidates.sort(key=lambda x:(-x[1],x[2]))
-            return normalize_text(candidates[0][0])
-
-        return "Unknown"
+            from scoring import score_page
+            _score_page=score_page
+        except ImportError:  # NumPy not installed: score line by line
+            _score_page=False
+    return _score_page
 
-    def _extract_headings(self)->List[Dict]:
-        headings=[]
-
-        for page_num in range(len(self.doc)):
-            page=self.doc[page_num]
-            blocks=page.get_text("dict")["blocks"]
-            for block in blocks:
-                if "lines" in block:
-                    for line in block["lines"]:
-                        line_text=""
-                        font_info=get_font_info(line)
-                        for span in line["spans"]:
-                            text=span["text"].strip()
-                            if text:
-                                line_text += text + " "
-                        line_text=line_text.strip()
-
-                        if line_text and is_likely_heading(line_text, font_info, self.avg_font_size, self.language):
-                            level = detect_heading_level(line_text,font_info, self.font_sizes,self.language)
-                            if level:
-                                headings.append({
-                                    "level":level,
-                                    "text":normalize_text(line_text),
-                                    "page":page_num + 1
-                                })
-
-        return headings
-
-
-def process_pdf_file(input_path: str, output_path: str):
-    extractor=PDFOutlineExtractor()
-    result=extractor.extract_outline(input_path)
-
-    with open(output_path,'w',encoding='utf-8') as f:
-        json.dump(result,f,ensure_ascii=False,indent=2)
-
-    print(f"Processed:{input_path}->{output_path}")
-
-
-def main():
-    input_dir=Path(INPUT_DIR)
-    output_dir=Path(OUTPUT_DIR)
-    output_dir.mkdir(exist_ok=True)
-
-    pdf_files=list(input_dir.glob("*.pdf"))
-    if not pdf_files:
-        print("No PDF files found in input directory",file=sys.stderr)
-        return
-
-    for pdf_file in pdf_files:
-        output_file=output_dir / f"{pdf_file.stem}.json"
-        process_pdf_file(str(pdf_file),str(output_file))
-
-    print(f"Processed{len(pdf_files)} PDF files")
-
-
-if __name__ == "__main__":
-    main()
-
-import os
-import json
-import sys
-import re
-from pathlib import Path
-from typing import Dict, List
-
-import fitz  
-import pdfplumber
-from langdetect import detect
-from langdetect.lang_detect_exception import LangDetectException
-
-from utils import (
-    detect_heading_level,
-    extract_title_from_text,
-    is_likely_heading,
-    normalize_text,
-    get_font_info
-)
-from config import(
-    INPUT_DIR,
-    OUTPUT_DIR,
-    HEADING_PATTERNS,
-    FONT_SIZE_THRESHOLDS,
-    MAX_TITLE_LENGTH
-)
 
 class PDFOutlineExtractor:
-    def __init__(self):
+    def __init__(self, page_workers: int=1, max_seconds: float=MAX_PROCESSING_TIME,
+                 max_pages: int=MAX_PAGES_TO_ANALYZE, use_toc: bool=True, instrument: bool=False,
+                 low_memory: bool=False, max_rss_mb: float=MAX_RSS_MB, use_triage: bool=True,
+                 keep_lines: bool=False):
+        self.page_workers=page_workers
+        self.keep_lines=keep_lines
+        self.use_triage=use_triage
+        self.instrument=instrument
+        self.low_memory=low_memory
+        self.max_rss_mb=max_rss_mb
+        self.use_toc=use_toc
+        self.max_seconds=max_seconds
+        self.max_pages=max_pages
+        self.budget_report=None
+        self._reset()
+
+    def cache_settings(self) -> Dict:
+        """Options that change the result, mixed into the result-cache key."""
+        return {"use_toc":self.use_toc,"use_triage":self.use_triage,"max_pages":self.max_pages or 0}
+
+    def _reset(self):
+        self.pdf_path = None
         self.doc = None
+        self.layout = None
         self.language = 'en'
         self.font_sizes = []
+        self.font_stats = FontStatistics()
         self.avg_font_size = 12
-
-    def extract_outline(self, pdf_path: str) -> Dict:
+        self.budget = None
+        self.strategy = None
+        self.metrics = None
+        self.error = None
+        self.triage = None
+        self.line_tables = None
+
+    def extract_outline(self, pdf_path: str, stream: bytes=None) -> Dict:
+        """Extract the outline of a PDF file, or of in-memory PDF bytes when ``stream`` is given."""
+        return self._collect(self.iter_outline(pdf_path,stream),pdf_path or '<stream>')
+
+    def extract_stored_outline(self, lines_path: str) -> Dict:
+        """Re-run title and heading detection on line tables saved with ``keep_lines``."""
+        return self._collect(self.iter_stored_outline(lines_path),lines_path)
+
+    def _collect(self, items: Iterator[Tuple[str, object]], name: str) -> Dict:
         try:
-            self.doc=fitz.open(pdf_path)
-            self._analyze_document_structure()
-            title=self._extract_title()
-            outline=self._extract_headings()
-            return {
-                "title":title,
-                "outline":outline
-            }
+            result={"title":"Unknown","outline":[]}
+            for kind,value in items:
+                if kind=="heading":
+                    result["outline"].append(value)
+                else:
+                    result[kind]=value
+            return result
         except Exception as e:
-            print(f"Error processing {pdf_path}: {str(e)}",file=sys.stderr)
+            self.error=str(e)
+            print(f"Error processing {name}: {str(e)}",file=sys.stderr)
             return {"title": "Unknown", "outline":[]}
+
+    def iter_outline(self, pdf_path: str, stream: bytes=None) -> Iterator[Tuple[str, object]]:
+        """Yield ("title", title), then ("heading", heading) page by page as the scan runs.
+
+        A final ("truncated", marker) follows when a budget ran out. A document
+        that triage rejects yields a single ("skipped", marker). Closing the
+        generator early stops the scan and closes the document; errors are
+        raised to the caller. With instrumentation on, the headings stage timer
+        includes time the caller spends between headings.
+        """
+        import fitz
+
+        self._start()
+        try:
+            try:
+                if stream is not None:
+                    self.doc=fitz.open(stream=stream,filetype="pdf")
+                else:
+                    self.pdf_path=pdf_path
+                    self.doc=fitz.open(pdf_path)
+            except fitz.FileDataError as e:
+                if not self.use_triage:
+                    raise
+                self.triage=open_failure(e)
+            else:
+                self.layout=self._new_layout()
+                self._pin_sampled_pages()
+                if self.use_triage:
+                    with stage(self.metrics,"triage"):
+                        self.triage=triage_document(self.doc,self.layout,self.use_toc)
+            if self.triage and self.triage.route==SKIP:
+                yield "skipped",self.triage.marker()
+                return
+
+            yield from self._iter_stages()
+            if self.keep_lines:
+                self.line_tables=self._complete_line_tables()
         finally:
-            if self.doc:
-                self.doc.close()
+            self._finish()
 
-    def _analyze_document_structure(self):
-        font_sizes=[]
-        text_sample=""
-        max_pages=min(5, len(self.doc))
-
-        for page_num in range(max_pages):
-            page=self.doc[page_num]
-            blocks=page.get_text("dict")["blocks"]
-            for block in blocks:
-                if "lines" in block:
-                    for line in block["lines"]:
-                        for span in line["spans"]:
-                            font_size=span["size"]
-                            text=span["text"].strip()
-                            if text and len(text) > 2:
-                                font_sizes.append(font_size)
-                                text_sample += text + " "
-
-        if font_sizes:
-            self.font_sizes=sorted(set(font_sizes),reverse=True)
-            self.avg_font_size=sum(font_sizes) / len(font_sizes)
+    def iter_stored_outline(self, lines_path: str) -> Iterator[Tuple[str, object]]:
+        """Like ``iter_outline``, but reads a ``.lines.npz`` file instead of the PDF."""
+        from linestore import load_line_tables
 
+        self._start()
         try:
-            if text_sample.strip():
-                self.language=detect(text_sample[:1000])
-        except LangDetectException:
-            self.language='en'
+            self.doc,self.layout=load_line_tables(lines_path)
+            yield from self._iter_stages()
+        finally:
+            self._finish()
+
+    def _start(self):
+        self._reset()
+        self.budget=ExtractionBudget(self.max_seconds,self.max_pages,self.max_rss_mb,self._release_memory)
+        self.metrics=Instrumentation() if self.instrument else None
+
+    def _iter_stages(self) -> Iterator[Tuple[str, object]]:
+        metrics=self.metrics
+        with stage(metrics,"structure"):
+            self._analyze_document_structure()
+        with stage(metrics,"title"):
+            title=self._extract_title()
+        yield "title",title
+
+        outline=None
+        if self.use_toc and (self.triage is None or self.triage.route==FAST):
+            with stage(metrics,"toc"):
+                outline=self._extract_toc_headings()
+        if outline is not None:
+            self.strategy="toc"
+            for heading in outline:
+                yield "heading",heading
+        else:
+            self.strategy="scan"
+            with stage(metrics,"headings"):
+                for heading in self._iter_headings():
+                    yield "heading",heading
+        if self.budget.truncated:
+            yield "truncated",self.budget.marker()
+
+    def _finish(self):
+        self.budget_report=self.budget.report()
+        self.budget_report["strategy"]=self.strategy
+        self.budget_report["route"]=self.triage.category if self.triage else None
+        if self.metrics is not None and self.layout:
+            self.metrics.count("pages_laid_out",self.layout.pages_parsed)
+            self.metrics.count("spans_visited",self.layout.spans_visited)
+        if self.layout:
+            self.layout.clear()
+            self.layout=None
+        if self.doc:
+            self.doc.close()
+
+    def _complete_line_tables(self) -> Tuple[int, List[list], Dict]:
+        """Lay out the pages no stage needed so the saved tables cover the whole document."""
+        recorded=self.layout.record
+        for page_num in range(len(self.doc)):
+            if page_num not in recorded:
+                self.layout.lines(page_num)
+        return len(self.doc),self.doc.get_toc(simple=True),recorded
+
+    def _new_layout(self) -> PageLayoutCache:
+        return PageLayoutCache(self.doc,LOW_MEMORY_LAYOUT_PAGES if self.low_memory else LAYOUT_CACHE_PAGES,
+                               {} if self.keep_lines else None)
+
+    def _pin_sampled_pages(self):
+        """Keep the triage probes and font samples cached until the heading scan reaches them."""
+        if self.low_memory:
+            return
+        page_count=len(self.doc)
+        limit=self.budget.page_limit(0,page_count) if self.budget else page_count
+        pages={0}|set(sample_pages(page_count,FONT_SAMPLE_PAGES))
+        if self.use_triage:
+            pages|=set(sample_pages(page_count,TRIAGE_PROBE_PAGES))
+        self.layout.pin(page for page in pages if page<limit)
+
+    def _release_memory(self):
+        """Drop cached page layouts and empty MuPDF's font/image store."""
+        if self.layout:
+            self.layout.clear()
+        import fitz
+
+        fitz.TOOLS.store_shrink(100)
+
+    def _analyze_document_structure(self):
+        """Build font statistics and detect the language from a fixed-size sample of pages."""
+        font_stats=FontStatistics()
+        language_sample=LanguageSample()
+        pages=sample_pages(len(self.doc),FONT_SAMPLE_PAGES)
+        spans_per_page=max(1,FONT_SAMPLE_MAX_SPANS//max(1,len(pages)))
+        chars_left=FONT_SAMPLE_MAX_CHARS
+
+        for page_num in pages:
+            page_lines=self.layout.lines(page_num)
+            for font_size,chars in zip(page_lines.stat_sizes[:spans_per_page],
+                                       page_lines.stat_chars[:spans_per_page]):
+                font_stats.add(font_size,chars)
+                chars_left-=chars
+                if chars_left<=0:
+                    break
+            language_sample.add(page_lines.sample)
+            if chars_left<=0:
+                break
+
+        self.font_stats=font_stats.finalize()
+        if font_stats.span_count:
+            self.font_sizes=font_stats.sizes
+            self.avg_font_size=font_stats.avg_font_size
+
+        self.language=detect_language(language_sample.text())
 
     def _extract_title(self) -> str:
         if not self.doc or len(self.doc) == 0:
             return "Unknown"
 
-        first_page=self.doc[0]
-        blocks=first_page.get_text("dict")["blocks"]
         candidates=[]
-
-        for block in blocks:
-            if "lines" in block:
-                for line in block["lines"]:
-                    line_text=""
-                    max_font_size=0
-                    for span in line["spans"]:
-                        text=span["text"].strip()
-                        font_size=span["size"]
-                        if text:
-                            line_text += text + " "
-                            max_font_size=max(max_font_size,font_size)
-
-                    line_text = line_text.strip()
-                    if (line_text and len(line_text)<=MAX_TITLE_LENGTH and
-                            len(line_text)>3 and max_font_size>self.avg_font_size*1.2):
-                        candidates.append((line_text, max_font_size,len(line_text)))
+        for line in self.layout.lines(0).lines:
+            line_text=line.text
+            if (len(line_text)<=MAX_TITLE_LENGTH and
+                    len(line_text)>3 and line.title_size>self.avg_font_size*1.2):
+                candidates.append((line_text, line.title_size,len(line_text)))
 
         if candidates:
             candidates.sort(key=lambda x:(-x[1], x[2]))
@@ -279,61 +286,483 @@ class PDFOutlineExtractor:
 
         return "Unknown"
 
-    def _extract_headings(self)->List[Dict]:
-        headings=[]
+    def _extract_toc_headings(self) -> Optional[List[Dict]]:
+        """Return H1-H3 headings from the embedded bookmarks, or None if they can't be trusted."""
+        page_count=len(self.doc)
+        toc=self.doc.get_toc(simple=True)
+        if not toc:
+            return None
+
+        entries=[(level,normalize_text(title),page) for level,title,page in toc
+                 if 1<=page<=page_count and normalize_text(title)]
+        if len(entries)<len(toc)*TOC_MIN_VALID_RATIO:
+            return None
+
+        # Spot-check evenly spaced entries against the text of their target page
+        checks=min(TOC_SPOT_CHECKS,len(entries))
+        picks=sorted({round(i*(len(entries)-1)/max(1,checks-1)) for i in range(checks)})
+        for index in picks:
+            _,title,page=entries[index]
+            if _squash(title) not in _squash(self._page_text(page-1)):
+                return None
+
+        if self.budget:
+            self.budget.page_count=page_count
+            self.budget.pages_scanned=len(picks)
+        return [{"level":f"H{level}","text":title,"page":page}
+                for level,title,page in entries if level<=3]
+
+    def _page_text(self, page_num: int) -> str:
+        return " ".join(line.text for line in self.layout.lines(page_num).lines)
+
+    def _extract_headings(self, start: int=0, end: int=None)->List[Dict]:
+        return list(self._iter_headings(start,end))
+
+    def _iter_headings(self, start: int=0, end: int=None)->Iterator[Dict]:
+        """Yield the headings of pages ``start``-``end`` in page order, within the budget."""
+        end=len(self.doc) if end is None else end
+        budget=self.budget
+        limit=end
+        if budget:
+            budget.page_count=end-start
+            limit=budget.page_limit(start,end)
+
+        if self.page_workers>1 and self.pdf_path and limit-start>=PAGE_PARALLEL_MIN_PAGES:
+            yield from self._iter_headings_parallel(start,limit)
+        else:
+            for page_num in range(start,limit):
+                if budget and budget.exhausted():
+                    break
+                yield from self._extract_page_headings(page_num)
+                self.layout.unpin(page_num)
+                if budget:
+                    budget.pages_scanned+=1
+                if self.low_memory and (page_num-start+1)%LOW_MEMORY_WINDOW_PAGES==0:
+                    self._release_memory()
+
+        if budget and not budget.truncated and limit<end:
+            budget.truncated="pages"
+
+    def _extract_page_headings(self, page_num: int)->List[Dict]:
+        page_lines=self.layout.lines(page_num)
+        metrics=self.metrics
+        if metrics is not None:
+            metrics.count("lines_classified",len(page_lines.lines))
+        score_page=_load_scorer()
+        if score_page:
+            scored=score_page(page_lines, self.avg_font_size, self.font_stats, self.language, metrics)
+        else:
+            scored=[]
+            for line in page_lines.lines:
+                accepted,rule=heading_decision(line.text, line, self.avg_font_size, self.language)
+                if metrics is not None:
+                    metrics.count(f"rule.{rule}.{'accepted' if accepted else 'rejected'}")
+                    metrics.count("regex_evaluations",CUE_REGEX_EVALUATIONS.get(rule,0)+accepted)
+                if accepted:
+                    level=detect_heading_level(line.text, line, self.font_stats, self.language)
+                    if level:
+                        scored.append((line,level))
+
+        return [{
+            "level":level,
+            "text":normalize_text(line.text),
+            "page":page_num+1
+        } for line,level in scored]
+
+    def _iter_headings_parallel(self, start: int, end: int)->Iterator[Dict]:
+        """Scan page chunks on a process pool and yield their headings in page order.
+
+        When the time budget runs out (or the caller stops early) the chunk
+        processes are terminated, and the outline ends at the last chunk
+        that finished in page order. If not even the first chunk returns in
+        time, there are no headings.
+        """
+        stats={
+            "avg_font_size":self.avg_font_size,
+            "font_stats":self.font_stats.to_dict(),
+            "language":self.language,
+            "low_memory":self.low_memory,
+        }
+        size=self._chunk_size()
+        chunks=[(page,min(page+size,end)) for page in range(start,end,size)]
+        budget=self.budget
+        import multiprocessing
+
+        _load_scorer()  # import NumPy once here, so forked chunk workers inherit it
+        pool=multiprocessing.Pool(self.page_workers)
+        finished=False
+        try:
+            results=pool.imap(_extract_headings_chunk,
+                              [(self.pdf_path,chunk_start,chunk_end,stats) for chunk_start,chunk_end in chunks])
+            for chunk_start,chunk_end in chunks:
+                try:
+                    headings=results.next(timeout=budget.remaining() if budget else None)
+                except multiprocessing.TimeoutError:
+                    budget.truncated="time"
+                    break
+                if budget:
+                    budget.pages_scanned+=chunk_end-chunk_start
+                yield from headings
+            else:
+                finished=True
+        finally:
+            if finished:
+                pool.close()
+            else:
+                pool.terminate()
+            pool.join()
+
+    def _chunk_size(self) -> int:
+        """PAGE_CHUNK_SIZE, shrunk under a time budget so one chunk fits a share of the time left."""
+        budget=self.budget
+        if not (budget and budget.max_seconds and self.layout and self.layout.pages_parsed):
+            return PAGE_CHUNK_SIZE
+        seconds_per_page=budget.elapsed()/self.layout.pages_parsed
+        return max(1,min(PAGE_CHUNK_SIZE,int(budget.remaining()*PAGE_CHUNK_BUDGET_SHARE/seconds_per_page)))
+
+
+def _squash(text: str) -> str:
+    """Lower-case text with all whitespace removed, for layout-insensitive comparison."""
+    return "".join(text.split()).lower()
+
+
+def _extract_headings_chunk(job: Tuple[str, int, int, Dict])->List[Dict]:
+    pdf_path,start,end,stats=job
+    extractor=PDFOutlineExtractor(low_memory=stats["low_memory"])
+    extractor.avg_font_size=stats["avg_font_size"]
+    extractor.font_stats=FontStatistics.from_dict(stats["font_stats"])
+    extractor.font_sizes=extractor.font_stats.sizes
+    extractor.language=stats["language"]
+    import fitz
+
+    extractor.doc=fitz.open(pdf_path)
+    try:
+        extractor.layout=extractor._new_layout()
+        return extractor._extract_headings(start,end)
+    finally:
+        extractor.doc.close()
+
+
+def iter_outline(pdf_path: str, extractor: PDFOutlineExtractor=None) -> Iterator[Tuple[str, object]]:
+    """Stream the outline of a PDF; see ``PDFOutlineExtractor.iter_outline``."""
+    return (extractor or PDFOutlineExtractor()).iter_outline(pdf_path)
+
+
+def extract_cached(input_path: str, extractor: PDFOutlineExtractor=None, cache: ResultCache=None) -> Dict:
+    """Return the outline of a PDF, consulting the result cache first when one is given.
+
+    Saved line tables (``*.lines.npz``) are reclassified directly, and an
+    extractor that keeps line tables always re-parses the PDF.
+    """
+    extractor=extractor or PDFOutlineExtractor()
+    extractor.error=None
+    if input_path.endswith(LINE_TABLES_SUFFIX):
+        return extractor.extract_stored_outline(input_path)
+    if extractor.keep_lines:
+        cache=None
+    key=None
+    if cache:
+        key=cache.key_for(input_path,extractor.cache_settings())
+        result=cache.get(key)
+        if result is not None:
+            return result
 
-        for page_num in range(len(self.doc)):
-            page=self.doc[page_num]
-            blocks=page.get_text("dict")["blocks"]
-            for block in blocks:
-                if "lines" in block:
-                    for line in block["lines"]:
-                        line_text=""
-                        font_info=get_font_info(line)
-                        for span in line["spans"]:
-                            text=span["text"].strip()
-                            if text:
-                                line_text += text + " "
-                        line_text=line_text.strip()
-
-                        if line_text and is_likely_heading(line_text, font_info, self.avg_font_size, self.language):
-                            level=detect_heading_level(line_text, font_info, self.font_sizes, self.language)
-                            if level:
-                                headings.append({
-                                    "level":level,
-                                    "text":normalize_text(line_text),
-                                    "page":page_num+1
-                                })
-
-        return headings
-
-
-def process_pdf_file(input_path: str, output_path: str):
-    extractor=PDFOutlineExtractor()
     result=extractor.extract_outline(input_path)
+    # a page-limited result is reproducible (max_pages is part of the key); time/memory cut-offs are not
+    truncated=result.get("truncated")
+    if cache and extractor.error is None and (truncated is None or truncated["reason"]=="pages"):
+        cache.put(key,result)
+    return result
+
+
+def process_pdf_file(input_path: str, output_path: str, extractor: PDFOutlineExtractor=None,
+                     cache: ResultCache=None, profile: str=None, write_output: bool=True) -> Dict:
+    """Extract one PDF to ``output_path`` and return the result.
+
+    With an instrumented extractor the stage timers and counters are written
+    to ``<name>.metrics.json``, and ``profile`` ('cprofile' or 'tracemalloc')
+    dumps a profile next to the output JSON. With ``write_output=False`` the
+    outline itself is only returned, with an ``error`` entry if extraction failed.
+    """
+    extractor=extractor or PDFOutlineExtractor()
+    extractor.budget_report=None
+    extractor.metrics=None
+    extractor.error=None
+    extractor.line_tables=None
+    result=run_profiled(profile,output_path,extract_cached,input_path,extractor,cache)
+    if write_output:
+        write_json_atomic(output_path,result,ensure_ascii=False,indent=2)
+    elif extractor.error:
+        result=dict(result,error=extractor.error)
+    if extractor.line_tables is not None:
+        from linestore import save_line_tables
+        save_line_tables(artifact_path(output_path,LINE_TABLES_SUFFIX),*extractor.line_tables)
+        extractor.line_tables=None
+    if extractor.metrics is not None:
+        report=extractor.metrics.report()
+        report["budget"]=extractor.budget_report
+        write_json_atomic(artifact_path(output_path,".metrics.json"),report,indent=2)
+
+    destination=output_path if write_output else "stream"
+    print(f"Processed: {input_path}->{destination} ({_describe_budget(extractor.budget_report)})",
+          file=sys.stdout if write_output else sys.stderr)
+    return result
+
+
+def _describe_budget(report: Dict) -> str:
+    if report is None:
+        return "cached"
+    if report["route"] and report["route"].startswith(SKIP):
+        return f"{report['elapsed_seconds']:.2f}s, skipped: {report['route'].split(':',1)[1]}"
+    text=f"{report['elapsed_seconds']:.2f}s, {report['pages_scanned']}/{report['page_count']} pages"
+    if report["strategy"]=="toc":
+        text+=", from bookmarks"
+    if report["truncated"]:
+        text+=f", truncated: {report['truncated']} budget"
+    return text
+
+
+_worker_extractor=None
+_worker_cache=None
+_worker_profile=None
+_worker_write_output=True
+
+
+def build_extractor(args: argparse.Namespace) -> PDFOutlineExtractor:
+    """Create an extractor configured from parsed command-line (or service) options."""
+    return PDFOutlineExtractor(args.page_workers,args.max_seconds,args.max_pages,
+                               not args.no_toc,getattr(args,"metrics",False),
+                               low_memory=getattr(args,"low_memory",False),
+                               max_rss_mb=getattr(args,"max_rss_mb",MAX_RSS_MB),
+                               use_triage=not getattr(args,"no_triage",False),
+                               keep_lines=getattr(args,"save_lines",False))
+
+
+def _init_worker(args: argparse.Namespace):
+    global _worker_extractor, _worker_cache, _worker_profile, _worker_write_output
+    _worker_extractor=build_extractor(args)
+    _worker_cache=ResultCache(args.cache_dir) if args.cache_dir else None
+    _worker_profile=getattr(args,"profile",None)
+    _worker_write_output=not getattr(args,"ndjson",None)
+
+
+def _init_warm_worker(args: argparse.Namespace):
+    """Worker initializer for long-lived pools: also load the langdetect profiles.
+
+    Workers ignore SIGINT so Ctrl-C stops the parent, which shuts the pool down,
+    instead of printing a KeyboardInterrupt traceback from every worker.
+    """
+    import signal
+
+    signal.signal(signal.SIGINT,signal.SIG_IGN)
+    _init_worker(args)
+    detect_language("Warm up the language profiles before the first document arrives.")
+
+
+def _process_in_worker(input_path: str, output_path: str,
+                       watchdog: WorkerWatchdog=None) -> Tuple[Dict, Optional[str]]:
+    """Run one job and return (result, triage category or "cached")."""
+    if watchdog is not None:
+        watchdog.begin(input_path)
+    try:
+        result=process_pdf_file(input_path,output_path,_worker_extractor,_worker_cache,_worker_profile,
+                                _worker_write_output)
+    finally:
+        if watchdog is not None:
+            watchdog.end()
+    report=_worker_extractor.budget_report
+    return result,report["route"] if report else "cached"
+
+
+def run_jobs(jobs: List[Tuple[str, str]],
+             args: argparse.Namespace) -> Iterator[Tuple[str, str, Optional[Dict], Optional[str], Optional[str]]]:
+    """Process (input, output) jobs and yield (input, output, result, route, error) as each finishes.
+
+    ``result`` is the extracted outline and ``route`` its triage category
+    ("fast", "full", "skip:<reason>", "cached"), or both are None with an
+    ``error`` message if the job failed.
+
+    With ``args.workers > 1`` jobs run on a process pool, largest PDF first, and
+    a worker still busy on one file after ``args.watchdog`` seconds is killed.
+    The pool is then rebuilt and the jobs that were not at fault are retried.
+    """
+    if args.workers<=1:
+        _init_worker(args)
+        for input_path,output_path in jobs:
+            try:
+                result,route=_process_in_worker(input_path,output_path)
+            except Exception as e:
+                print(f"Error processing {input_path}: {str(e)}",file=sys.stderr)
+                yield input_path,output_path,None,None,str(e)
+            else:
+                yield input_path,output_path,result,route,None
+        return
 
-    with open(output_path,'w',encoding='utf-8') as f:
-        json.dump(result,f,ensure_ascii=False,indent=2)
-
-    print(f"Processed: {input_path}->{output_path}")
-
-
-def main():
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+    from concurrent.futures.process import BrokenProcessPool
+
+    watchdog=WorkerWatchdog(args.watchdog) if args.watchdog else None
+    crashes={}
+    pending=sorted(jobs,key=lambda job:os.path.getsize(job[0]),reverse=True)
+    try:
+        while pending:
+            with ProcessPoolExecutor(max_workers=args.workers,initializer=_init_worker,
+                                     initargs=(args,)) as pool:
+                futures={pool.submit(_process_in_worker,src,dst,watchdog):(src,dst) for src,dst in pending}
+                pending=[]
+                broken=[]
+                for future in as_completed(futures):
+                    input_path,output_path=futures[future]
+                    try:
+                        result,route=future.result()
+                    except BrokenProcessPool:
+                        broken.append((input_path,output_path))
+                    except Exception as e:
+                        print(f"Error processing {input_path}: {str(e)}",file=sys.stderr)
+                        yield input_path,output_path,None,None,str(e)
+                    else:
+                        yield input_path,output_path,result,route,None
+
+            if not broken:
+                continue
+            hung,running=watchdog.inspect_break() if watchdog else (set(),set())
+            for input_path,output_path in broken:
+                if input_path in hung:
+                    error=f"killed by watchdog after {args.watchdog}s"
+                    print(f"Error processing {input_path}: {error}",file=sys.stderr)
+                    yield input_path,output_path,None,None,error
+                    continue
+                if not hung and (input_path in running or not watchdog):
+                    crashes[input_path]=crashes.get(input_path,0)+1
+                    if crashes[input_path]>WATCHDOG_MAX_RETRIES:
+                        print(f"Error processing {input_path}: worker process crashed",file=sys.stderr)
+                        yield input_path,output_path,None,None,"worker process crashed"
+                        continue
+                pending.append((input_path,output_path))
+    finally:
+        if watchdog:
+            watchdog.close()
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser=argparse.ArgumentParser(description="Extract title and H1-H3 outline from PDF files")
+    parser.add_argument("--workers",type=int,default=1,
+                        help="number of worker processes (default: 1, serial)")
+    parser.add_argument("--page-workers",type=int,default=1,
+                        help="split large documents into page chunks scanned by this many processes")
+    parser.add_argument("--no-toc",action="store_true",
+                        help="ignore embedded bookmarks and always scan page layout for headings")
+    parser.add_argument("--max-seconds",type=float,default=MAX_PROCESSING_TIME,
+                        help="per-document time budget; the outline is returned partial once spent (0: unlimited)")
+    parser.add_argument("--max-pages",type=int,default=MAX_PAGES_TO_ANALYZE,
+                        help="per-document page budget (0: unlimited)")
+    parser.add_argument("--no-triage",action="store_true",
+                        help="send every file through the full scan instead of probing it first")
+    parser.add_argument("--low-memory",action="store_true",
+                        help="keep only a small window of pages laid out and release MuPDF caches while scanning")
+    parser.add_argument("--max-rss-mb",type=float,default=MAX_RSS_MB,
+                        help="stop scanning a document once the worker's resident memory exceeds this (0: off)")
+    parser.add_argument("--watchdog",type=float,default=WATCHDOG_TIMEOUT,
+                        help="kill a worker process stuck on one file this long (with --workers; 0: off)")
+    parser.add_argument("--cache-dir",default=None,
+                        help="reuse results for unchanged PDFs from this content-addressed cache")
+    parser.add_argument("--incremental",action="store_true",
+                        help="only process new or modified PDFs and remove JSON of deleted ones")
+    parser.add_argument("--watch",action="store_true",
+                        help="run as a daemon that processes PDFs as they land in the input directory")
+    parser.add_argument("--poll-interval",type=float,default=WATCH_POLL_INTERVAL,
+                        help="seconds between directory scans in --watch mode")
+    parser.add_argument("--ndjson",metavar="PATH",default=None,
+                        help="stream one compact JSON line per document to PATH ('-': stdout) instead of per-file JSON")
+    parser.add_argument("--save-lines",action="store_true",
+                        help=f"also save each document's line tables as <name>{LINE_TABLES_SUFFIX} next to its output")
+    parser.add_argument("--reclassify",metavar="DIR",default=None,
+                        help=f"re-run title and heading detection on the {LINE_TABLES_SUFFIX} files in DIR without the PDFs")
+    parser.add_argument("--index-db",metavar="PATH",default=None,
+                        help="also index titles and headings in this SQLite database with full-text search")
+    parser.add_argument("--metrics",action="store_true",
+                        help="write stage timings and hot-path counters to <name>.metrics.json next to each output")
+    parser.add_argument("--profile",choices=PROFILE_MODES,default=None,
+                        help="run each document under cProfile (<name>.prof) or tracemalloc (<name>.tracemalloc.txt)")
+    args=parser.parse_args(argv)
+    if args.ndjson and (args.incremental or args.watch):
+        parser.error("--ndjson cannot be combined with --incremental or --watch")
+    if args.reclassify and (args.incremental or args.watch or args.save_lines):
+        parser.error("--reclassify cannot be combined with --incremental, --watch or --save-lines")
+    if args.page_workers>1 and 0<args.max_pages<PAGE_PARALLEL_MIN_PAGES:
+        # the parallel scan is sized by the pages actually scanned, which --max-pages caps
+        print(f"Warning: --page-workers only applies when --max-pages is 0 or at least {PAGE_PARALLEL_MIN_PAGES}",
+              file=sys.stderr)
+    return args
+
+
+def main(argv=None):
+    args=parse_args(argv)
     input_dir=Path(INPUT_DIR)
     output_dir=Path(OUTPUT_DIR)
     output_dir.mkdir(exist_ok=True)
 
-    pdf_files=list(input_dir.glob("*.pdf"))
-    if not pdf_files:
-        print("No PDF files found in input directory",file=sys.stderr)
+    if args.watch:
+        from daemon import run_daemon
+        run_daemon(args,input_dir,output_dir)
         return
 
-    for pdf_file in pdf_files:
-        output_file=output_dir/f"{pdf_file.stem}.json"
-        process_pdf_file(str(pdf_file),str(output_file))
-
-    print(f"Processed {len(pdf_files)} PDF files")
+    if args.reclassify:
+        input_dir,suffix=Path(args.reclassify),LINE_TABLES_SUFFIX
+    else:
+        suffix=".pdf"
+    pdf_files=list(input_dir.glob(f"*{suffix}"))
+    if not pdf_files:
+        print("No PDF files found in input directory",file=sys.stderr)
+        if not args.incremental:
+            return
+
+    manifest=None
+    removed=[]
+    if args.incremental:
+        manifest=SyncManifest(str(output_dir))
+        pdf_files,removed=manifest.plan(pdf_files)
+        for name in removed:
+            manifest.remove(name)
+        if removed:
+            print(f"Removed output of {len(removed)} deleted PDF files")
+
+    sink=None
+    if args.ndjson:
+        from ndjson import NDJSONWriter
+        sink=NDJSONWriter(args.ndjson)
+    index=None
+    if args.index_db:
+        from heading_index import HeadingIndex
+        index=HeadingIndex(args.index_db)
+        for name in removed:
+            index.remove(Path(name).stem)
+
+    jobs=[(str(pdf_file),str(output_dir/f"{pdf_file.name[:-len(suffix)]}.json")) for pdf_file in pdf_files]
+    routes={}
+    try:
+        for input_path,output_path,result,route,error in run_jobs(jobs,args):
+            route="error" if error else route or "untriaged"
+            routes[route]=routes.get(route,0)+1
+            if sink:
+                sink.write_result(input_path,result,error)
+            if index:
+                index.add(Path(output_path).stem,result,error)
+            if manifest and error is None:
+                manifest.record(input_path,output_path)
+    finally:
+        if manifest:
+            manifest.save()
+        if sink:
+            sink.close()
+        if index:
+            index.close()
+
+    log=sys.stderr if sink else sys.stdout
+    print(f"Processed {len(pdf_files)} PDF files",file=log)
+    if routes:
+        print("Triage: "+", ".join(f"{route} {count}" for route,count in sorted(routes.items())),file=log)
 
 
 if __name__ =="__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Newline-delimited JSON output: one compact record per document, in completion order.
+"""
+
+import json
+import os
+import sys
+from typing import Dict, Optional
+
+try:
+    import orjson
+except ImportError:  # orjson not installed: fall back to the standard library encoder
+    orjson = None
+
+
+def encode_line(record: Dict) -> bytes:
+    """Encode a record as one compact UTF-8 JSON line."""
+    if orjson is not None:
+        return orjson.dumps(record, option=orjson.OPT_APPEND_NEWLINE)
+    return (json.dumps(record, ensure_ascii=False, separators=(',', ':')) + "\n").encode('utf-8')
+
+
+def make_record(input_path: str, result: Optional[Dict] = None, error: Optional[str] = None) -> Dict:
+    """Build the line for one document: its file name, then the outline and/or an ``error``."""
+    record = {"file": os.path.basename(input_path)}
+    if result:
+        record.update(result)
+    if error:
+        record["error"] = error
+    return record
+
+
+class NDJSONWriter:
+    """Writes records to a file, or to stdout for ``path='-'``, flushing after each line.
+
+    Each line is written with a single call, so a reader tailing the file
+    never sees half a record.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        if path == '-':
+            self._stream = sys.stdout.buffer
+            self._owned = False
+        else:
+            self._stream = open(path, 'wb')
+            self._owned = True
+        self.count = 0
+
+    def write(self, record: Dict):
+        self._stream.write(encode_line(record))
+        self._stream.flush()
+        self.count += 1
+
+    def write_result(self, input_path: str, result: Optional[Dict] = None, error: Optional[str] = None):
+        self.write(make_record(input_path, result, error))
+
+    def close(self):
+        if self._owned:
+            self._stream.close()
+        else:
+            self._stream.flush()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Heading rule engine compiled once from config.HEADING_PATTERNS.
+"""
+
+import re
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+from config import HEADING_PATTERNS
+
+CJK_LANGUAGES = ('ja', 'zh', 'ko')
+
+
+def _combine(patterns: List[str]) -> re.Pattern:
+    """Join anchored patterns into a single alternation regex."""
+    return re.compile('|'.join(f'(?:{pattern})' for pattern in patterns))
+
+
+def _combine_levels(tables: List[Dict[str, List[str]]]) -> re.Pattern:
+    """Join level tables into one regex whose matching group names the level.
+
+    Earlier tables take precedence over later ones.
+    """
+    alternatives = []
+    for index, table in enumerate(tables):
+        for level, patterns in table.items():
+            for pattern in patterns:
+                alternatives.append(f'(?P<{level}_{index}_{len(alternatives)}>{pattern})')
+    return re.compile('|'.join(alternatives))
+
+
+def _compile_keywords(keywords: List[str]) -> re.Pattern:
+    """Build a single-scan matcher for a keyword set (longest keyword first)."""
+    ordered = sorted(set(keywords), key=len, reverse=True)
+    return re.compile('|'.join(re.escape(keyword) for keyword in ordered))
+
+
+class HeadingRules:
+    """Precompiled numbering, level and keyword rules for one language."""
+
+    def __init__(self, language: str):
+        self.language = language
+        is_cjk = language in CJK_LANGUAGES
+
+        numbered = list(HEADING_PATTERNS['numbered'])
+        level_tables = [HEADING_PATTERNS['levels']]
+        if is_cjk:
+            numbered.extend(HEADING_PATTERNS['japanese'])
+            level_tables.insert(0, HEADING_PATTERNS['japanese_levels'])
+
+        keywords = HEADING_PATTERNS['keywords']
+        self.numbered = _combine(numbered)
+        self.levels = _combine_levels(level_tables)
+        self.keywords = _compile_keywords(keywords.get(language, keywords['en']))
+
+    def is_numbered(self, text: str) -> bool:
+        """Return True if text starts with a heading numbering prefix."""
+        return self.numbered.match(text) is not None
+
+    def has_keyword(self, text_lower: str) -> bool:
+        """Return True if lower-cased text contains a heading keyword."""
+        return self.keywords.search(text_lower) is not None
+
+    def numbering_level(self, text: str) -> Optional[str]:
+        """Return the level implied by explicit numbering, if any."""
+        match = self.levels.match(text)
+        if match is None:
+            return None
+        return match.lastgroup.split('_', 1)[0]
+
+    def strip_numbering(self, text: str) -> str:
+        """Remove a leading numbering prefix from text."""
+        match = self.numbered.match(text)
+        return text[match.end():] if match else text
+
+
+@lru_cache(maxsize=None)
+def get_rules(language: str) -> HeadingRules:
+    """Return the compiled rules for a language, building them on first use."""
+    return HeadingRules(language)
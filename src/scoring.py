@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Vectorized heading scoring over a page's line table.
+
+Applies the size, length and sentence gates of ``is_likely_heading`` and the
+font-size ranking of ``detect_heading_level`` as NumPy array operations, so
+the regex and capitalization checks only run on the few lines that survive.
+"""
+
+from typing import List, Tuple
+
+import numpy as np
+
+from font_stats import FontStatistics
+from layout import LineRecord, PageLines
+from rules import get_rules
+from utils import CUE_REGEX_EVALUATIONS, heading_cue
+
+
+def score_page(page_lines: PageLines, avg_font_size: float, font_stats: FontStatistics,
+               language: str = 'en', metrics=None) -> List[Tuple[LineRecord, str]]:
+    """Return (line, level) for every heading on a page, in reading order.
+
+    Gives the same answer as calling ``is_likely_heading`` and
+    ``detect_heading_level`` on each line. ``metrics`` is an optional
+    ``instrument.Instrumentation`` that receives per-rule counts.
+    """
+    if not page_lines.lines:
+        return []
+
+    sizes = np.frombuffer(page_lines.line_sizes, dtype=np.float64)
+    lengths = np.frombuffer(page_lines.line_lengths, dtype=np.dtype(page_lines.line_lengths.typecode))
+    bold = np.frombuffer(page_lines.line_bold, dtype=np.int8).astype(bool)
+    period = np.frombuffer(page_lines.line_period, dtype=np.int8).astype(bool)
+
+    survivors = (lengths >= 2) & (lengths <= 200) & ~period & (sizes > avg_font_size * 1.1)
+    if metrics is not None:
+        _count_gate_rejections(metrics, lengths, period, sizes > avg_font_size * 1.1)
+    candidates = np.flatnonzero(survivors)
+    if not candidates.size:
+        return []
+
+    if font_stats:
+        thresholds, levels = font_stats.level_table()
+        size_levels = np.asarray(levels)[np.searchsorted(thresholds, sizes[candidates], side='right')]
+    else:
+        size_levels = None
+
+    rules = get_rules(language)
+    headings = []
+    for position, index in enumerate(candidates.tolist()):
+        line = page_lines.lines[index]
+        if bold[index]:
+            rule = 'bold'
+        else:
+            rule = heading_cue(line.text, language)
+            if metrics is not None:
+                metrics.count('regex_evaluations', CUE_REGEX_EVALUATIONS[rule or 'no_cue'])
+            if rule is None:
+                if metrics is not None:
+                    metrics.count('rule.no_cue.rejected')
+                continue
+        if metrics is not None:
+            metrics.count(f'rule.{rule}.accepted')
+        if size_levels is None:
+            level = "H1"
+        else:
+            level = rules.numbering_level(line.text) or str(size_levels[position])
+            if metrics is not None:
+                metrics.count('regex_evaluations')
+        headings.append((line, level))
+    return headings
+
+
+def _count_gate_rejections(metrics, lengths: np.ndarray, period: np.ndarray, large: np.ndarray):
+    """Attribute each line failing a gate to the first gate it fails, in ``is_likely_heading`` order."""
+    remaining = np.ones(lengths.shape, dtype=bool)
+    for rule, rejected in (('short', lengths < 2), ('too_long', lengths > 200),
+                           ('sentence', period), ('small_font', ~large)):
+        hits = remaining & rejected
+        if hits.any():
+            metrics.count(f'rule.{rule}.rejected', int(np.count_nonzero(hits)))
+            remaining &= ~hits
@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""
+Local extraction service: PDF bytes or a path in, outline JSON out.
+
+    POST /extract   body: PDF bytes (application/pdf) or {"path": "..."} (application/json)
+    GET  /health    liveness check
+    GET  /metrics   request counters and latency
+
+A worker still busy on one request after ``--watchdog`` seconds is killed, and
+the pool is rebuilt whenever a worker dies.
+"""
+
+import argparse
+import json
+import os
+import socketserver
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout, wait
+from concurrent.futures.process import BrokenProcessPool
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from itertools import count
+from typing import Callable, Dict, Optional, Set
+
+import main
+from budget import WorkerWatchdog
+from config import (
+    MAX_PAGES_TO_ANALYZE,
+    MAX_PROCESSING_TIME,
+    SERVER_HOST,
+    SERVER_MAX_BODY_BYTES,
+    SERVER_PORT,
+    SERVER_REQUEST_TIMEOUT,
+    WATCHDOG_MAX_RETRIES,
+)
+
+# Broken pools whose watchdog verdict is kept for requests that notice the break late
+RECENT_BREAKS = 8
+_request_ids = count(1)
+
+
+def _extract_path(pdf_path: str) -> Dict:
+    return main.extract_cached(pdf_path, main._worker_extractor, main._worker_cache)
+
+
+def _extract_bytes(data: bytes) -> Dict:
+    return main._worker_extractor.extract_outline(None, stream=data)
+
+
+def _run_job(func: Callable, payload, label: str, watchdog: Optional[WorkerWatchdog]) -> Dict:
+    if watchdog is not None:
+        watchdog.begin(label)
+    try:
+        return func(payload)
+    finally:
+        if watchdog is not None:
+            watchdog.end()
+
+
+class WorkerPool:
+    """Warm process pool that is replaced when a worker dies.
+
+    A worker killed by the watchdog (or crashing in native code) breaks the
+    whole ProcessPoolExecutor; the first request to notice swaps in a new pool
+    and later requests go to that one. Requests caught in a break they did
+    not cause are resubmitted by the handler.
+    """
+
+    def __init__(self, args: argparse.Namespace, watchdog: Optional[WorkerWatchdog]):
+        self.args = args
+        self.watchdog = watchdog
+        self.restarts = 0
+        self._hung: Dict[ProcessPoolExecutor, Set[str]] = {}
+        self._lock = threading.Lock()
+        self._pool = self._start()
+
+    def _start(self) -> ProcessPoolExecutor:
+        pool = ProcessPoolExecutor(max_workers=self.args.workers, initializer=main._init_warm_worker,
+                                   initargs=(self.args,))
+        wait([pool.submit(time.time) for _ in range(self.args.workers)])
+        return pool
+
+    def submit(self, func: Callable, payload, label: str):
+        """Return (pool, future) for one job, rebuilding the pool if it is already broken."""
+        with self._lock:
+            pool = self._pool
+        try:
+            return pool, pool.submit(_run_job, func, payload, label, self.watchdog)
+        except BrokenProcessPool:
+            self.restart(pool)
+            with self._lock:
+                pool = self._pool
+            return pool, pool.submit(_run_job, func, payload, label, self.watchdog)
+
+    def restart(self, broken: ProcessPoolExecutor) -> Set[str]:
+        """Replace ``broken`` with a fresh pool unless another request already did.
+
+        Returns the labels of the jobs the watchdog killed in that break, so
+        the requests that were only running alongside them can be resubmitted.
+        """
+        with self._lock:
+            if self._pool is broken:
+                broken.shutdown(wait=False, cancel_futures=True)
+                hung = set()
+                if self.watchdog is not None:
+                    hung, _ = self.watchdog.inspect_break()
+                    for label in sorted(hung):
+                        print(f"Killed worker stuck on {label} for {self.watchdog.seconds}s", file=sys.stderr)
+                self._hung[broken] = hung
+                while len(self._hung) > RECENT_BREAKS:
+                    self._hung.pop(next(iter(self._hung)))
+                self._pool = self._start()
+                self.restarts += 1
+            return self._hung.get(broken, set())
+
+    def shutdown(self):
+        with self._lock:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+        if self.watchdog is not None:
+            self.watchdog.close()
+
+
+class ServiceMetrics:
+    """Thread-safe request counters exposed on /metrics."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started = time.time()
+        self.requests = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.worker_deaths = 0
+        self.in_flight = 0
+        self.total_seconds = 0.0
+
+    def begin(self):
+        with self._lock:
+            self.requests += 1
+            self.in_flight += 1
+
+    def end(self, seconds: float, error: bool = False, timeout: bool = False, worker_died: bool = False):
+        with self._lock:
+            self.in_flight -= 1
+            self.total_seconds += seconds
+            self.errors += error
+            self.timeouts += timeout
+            self.worker_deaths += worker_died
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            completed = self.requests - self.in_flight
+            return {
+                "uptime_seconds": round(time.time() - self.started, 3),
+                "requests": self.requests,
+                "errors": self.errors,
+                "timeouts": self.timeouts,
+                "worker_deaths": self.worker_deaths,
+                "in_flight": self.in_flight,
+                "avg_latency_ms": round(1000 * self.total_seconds / completed, 3) if completed else 0.0,
+            }
+
+
+class ExtractionHandler(BaseHTTPRequestHandler):
+    server_version = "PDFOutlineExtractor/1.0"
+
+    def address_string(self) -> str:
+        # Unix-socket peers have no (host, port) address
+        return self.client_address[0] if self.client_address else "unix"
+
+    def _send_json(self, status: int, payload: Dict):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._send_json(200, {"status": "ok"})
+        elif self.path == "/metrics":
+            self._send_json(200, self.server.metrics.snapshot())
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def do_POST(self):
+        if self.path != "/extract":
+            self._send_json(404, {"error": "not found"})
+            return
+
+        length = int(self.headers.get("Content-Length") or 0)
+        if length <= 0 or length > SERVER_MAX_BODY_BYTES:
+            self._send_json(413 if length else 400, {"error": "missing or oversized request body"})
+            return
+        body = self.rfile.read(length)
+
+        content_type = (self.headers.get("Content-Type") or "").split(";")[0].strip()
+        if content_type == "application/json":
+            try:
+                pdf_path = json.loads(body)["path"]
+            except (ValueError, KeyError, TypeError):
+                self._send_json(400, {"error": "expected {\"path\": ...}"})
+                return
+            if not os.path.isfile(pdf_path):
+                self._send_json(404, {"error": f"no such file: {pdf_path}"})
+                return
+            job = (_extract_path, pdf_path, f"{pdf_path} #{next(_request_ids)}")
+        else:
+            job = (_extract_bytes, body, f"<{length} bytes from {self.address_string()}> #{next(_request_ids)}")
+
+        metrics = self.server.metrics
+        metrics.begin()
+        started = time.perf_counter()
+        deadline = started + self.server.request_timeout
+        future = None
+        try:
+            for attempt in range(WATCHDOG_MAX_RETRIES + 1):
+                pool, future = self.server.workers.submit(*job)
+                try:
+                    result = future.result(timeout=max(0.0, deadline - time.perf_counter()))
+                    break
+                except BrokenProcessPool:
+                    # resubmit unless this job is the one the watchdog killed or keeps crashing
+                    hung = self.server.workers.restart(pool)
+                    if job[2] in hung:
+                        raise FutureTimeout from None
+                    if attempt == WATCHDOG_MAX_RETRIES:
+                        raise
+        except FutureTimeout:
+            # a job that is already running keeps its worker until it ends or the watchdog kills it
+            future.cancel()
+            metrics.end(time.perf_counter() - started, timeout=True)
+            self._send_json(504, {"error": "extraction timed out"})
+        except BrokenProcessPool:
+            metrics.end(time.perf_counter() - started, error=True, worker_died=True)
+            self._send_json(503, {"error": "worker process died during extraction"})
+        except Exception as e:
+            metrics.end(time.perf_counter() - started, error=True)
+            self._send_json(500, {"error": str(e)})
+        else:
+            metrics.end(time.perf_counter() - started)
+            self._send_json(200, result)
+
+
+class _ServiceMixin:
+    daemon_threads = True
+
+    def attach(self, workers: WorkerPool, request_timeout: float):
+        self.workers = workers
+        self.request_timeout = request_timeout
+        self.metrics = ServiceMetrics()
+
+
+class TCPExtractionServer(_ServiceMixin, ThreadingHTTPServer):
+    pass
+
+
+class UnixExtractionServer(_ServiceMixin, socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    pass
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Serve PDF outline extraction over HTTP")
+    parser.add_argument("--host", default=SERVER_HOST)
+    parser.add_argument("--port", type=int, default=SERVER_PORT)
+    parser.add_argument("--socket", default=None, help="listen on this Unix socket instead of TCP")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--timeout", type=float, default=SERVER_REQUEST_TIMEOUT,
+                        help="per-request extraction timeout in seconds")
+    parser.add_argument("--watchdog", type=float, default=None,
+                        help="kill a worker still busy on one request after this many seconds "
+                             "(default: --timeout; 0: off)")
+    parser.add_argument("--cache-dir", default=None, help="result cache used for path requests")
+    parser.add_argument("--max-seconds", type=float, default=MAX_PROCESSING_TIME,
+                        help="per-document time budget before a partial outline is returned")
+    parser.add_argument("--max-pages", type=int, default=MAX_PAGES_TO_ANALYZE,
+                        help="per-document page budget")
+    parser.add_argument("--no-toc", action="store_true", help="ignore embedded bookmarks")
+    args = parser.parse_args(argv)
+    args.page_workers = 1
+    if args.watchdog is None:
+        args.watchdog = args.timeout
+    return args
+
+
+def serve(args: argparse.Namespace):
+    workers = WorkerPool(args, WorkerWatchdog(args.watchdog) if args.watchdog else None)
+    try:
+        if args.socket:
+            if os.path.exists(args.socket):
+                os.remove(args.socket)
+            httpd = UnixExtractionServer(args.socket, ExtractionHandler)
+            where = args.socket
+        else:
+            httpd = TCPExtractionServer((args.host, args.port), ExtractionHandler)
+            where = f"http://{args.host}:{httpd.server_port}"
+        httpd.attach(workers, args.timeout)
+        print(f"Serving PDF outline extraction on {where} ({args.workers} workers)", file=sys.stderr)
+        try:
+            httpd.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            httpd.server_close()
+            if args.socket and os.path.exists(args.socket):
+                os.remove(args.socket)
+    finally:
+        workers.shutdown()
+
+
+if __name__ == "__main__":
+    serve(parse_args())
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Incremental directory sync: manifest of processed PDFs and atomic JSON writes.
+"""
+
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from config import SYNC_MANIFEST_NAME
+
+
+def write_json_atomic(path: str, data, **dump_kwargs):
+    """Write JSON through a temp file and rename so readers never see a partial file."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, **dump_kwargs)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _signature(pdf_path: Path) -> Dict:
+    stat = pdf_path.stat()
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+class SyncManifest:
+    """Record of which input PDFs have up-to-date JSON in the output directory.
+
+    Completed files are appended to a journal as they finish, so a run that
+    crashes part-way resumes from the last finished file; ``save`` folds the
+    journal back into the manifest.
+    """
+
+    def __init__(self, output_dir: str, name: str = SYNC_MANIFEST_NAME):
+        self.output_dir = Path(output_dir)
+        self.path = self.output_dir / name
+        self.journal_path = self.output_dir / f"{name}.journal"
+        self.entries: Dict[str, Dict] = {}
+        self._journal = None
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f).get("files", {})
+        except (OSError, ValueError):
+            self.entries = {}
+
+        try:
+            with open(self.journal_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue  # torn last line from a crash
+                    self._apply(record)
+        except OSError:
+            pass
+
+    def _apply(self, record: Dict):
+        if record.get("deleted"):
+            self.entries.pop(record["name"], None)
+        else:
+            self.entries[record["name"]] = record["entry"]
+
+    def _append(self, record: Dict):
+        if self._journal is None:
+            self._journal = open(self.journal_path, 'a', encoding='utf-8')
+        self._journal.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._journal.flush()
+        self._apply(record)
+
+    def plan(self, pdf_files: List[Path]) -> Tuple[List[Path], List[str]]:
+        """Return (PDFs that are new or changed, manifest names whose PDF is gone)."""
+        changed = []
+        for pdf_file in pdf_files:
+            entry = self.entries.get(pdf_file.name)
+            output_exists = entry and (self.output_dir / entry["output"]).exists()
+            if not output_exists or _signature(pdf_file) != entry["source"]:
+                changed.append(pdf_file)
+
+        present = {pdf_file.name for pdf_file in pdf_files}
+        removed = [name for name in self.entries if name not in present]
+        return changed, removed
+
+    def record(self, pdf_path: str, output_path: str):
+        """Mark a PDF as processed into ``output_path``."""
+        pdf_file = Path(pdf_path)
+        self._append({
+            "name": pdf_file.name,
+            "entry": {"source": _signature(pdf_file), "output": Path(output_path).name},
+        })
+
+    def remove(self, name: str):
+        """Delete the JSON of a PDF that no longer exists and forget it."""
+        entry = self.entries.get(name)
+        if entry:
+            output_path = self.output_dir / entry["output"]
+            if output_path.exists():
+                output_path.unlink()
+        self._append({"name": name, "deleted": True})
+
+    def save(self):
+        """Write the compacted manifest and drop the journal."""
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+        write_json_atomic(str(self.path), {"files": self.entries}, ensure_ascii=False, indent=2)
+        if self.journal_path.exists():
+            self.journal_path.unlink()
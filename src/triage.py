@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Pre-flight triage: route each document to the bookmark, scan or skip path
+from its metadata and a text-layer probe of a few pages.
+"""
+
+from typing import Dict, NamedTuple, Optional
+
+from config import TRIAGE_PROBE_PAGES
+from font_stats import sample_pages
+
+FAST = "fast"
+FULL = "full"
+SKIP = "skip"
+
+
+class Triage(NamedTuple):
+    """Where a document goes: ``route`` is FAST, FULL or SKIP; ``reason`` is set for SKIP."""
+
+    route: str
+    reason: Optional[str] = None
+    detail: Optional[str] = None
+
+    def marker(self) -> Dict:
+        """The ``skipped`` entry added to the output of a skipped document."""
+        marker = {"reason": self.reason}
+        if self.detail:
+            marker["detail"] = self.detail
+        return marker
+
+    @property
+    def category(self) -> str:
+        """Batch-report bucket: the route, or ``skip:<reason>``."""
+        return f"{SKIP}:{self.reason}" if self.route == SKIP else self.route
+
+
+def open_failure(error: Exception) -> Triage:
+    """Triage for a file fitz refused to open."""
+    return Triage(SKIP, "corrupt", str(error))
+
+
+def triage_document(doc, layout, use_toc: bool = True) -> Triage:
+    """Classify an open document without a full layout pass.
+
+    Encrypted and page-less documents are decided from metadata. Otherwise
+    TRIAGE_PROBE_PAGES pages spread across the document are laid out through
+    ``layout`` (so later stages reuse them); only if they hold no text at all
+    is the document skipped, as ``image_only`` when they carry images and
+    ``no_text`` otherwise. Any text, however short, sends it on to extraction.
+    Documents with bookmarks take the fast path.
+    """
+    if doc.needs_pass:
+        return Triage(SKIP, "encrypted")
+    if len(doc) == 0:
+        return Triage(SKIP, "empty")
+
+    probes = sample_pages(len(doc), TRIAGE_PROBE_PAGES)
+    for page_num in probes:
+        if layout.lines(page_num).lines:
+            break
+    else:
+        if any(doc[page_num].get_images() for page_num in probes):
+            return Triage(SKIP, "image_only")
+        return Triage(SKIP, "no_text")
+
+    if use_toc and doc.get_toc(simple=True):
+        return Triage(FAST)
+    return Triage(FULL)
@@ -4,8 +4,11 @@ Utility functions for PDF outline extraction with multilingual support.
 """
 
 import re
-from typing import Dict, List, Optional, Tuple
-from langdetect import detect, LangDetectException
+from typing import Dict, List, Optional, Tuple, Union
+
+from font_stats import FontStatistics
+from language import detect_language, script_histogram
+from rules import get_rules
 
 def normalize_text(text: str) -> str:
     """Normalize text by removing extra whitespace and cleaning up formatting."""
@@ -46,126 +49,91 @@ def get_font_info(line: Dict) -> Dict:
 
 def is_likely_heading(text: str, font_info: Dict, avg_font_size: float, language: str = 'en') -> bool:
     """Determine if text is likely a heading based on various criteria."""
+    return heading_decision(text, font_info, avg_font_size, language)[0]
+
+
+def heading_decision(text: str, font_info: Dict, avg_font_size: float,
+                     language: str = 'en') -> Tuple[bool, str]:
+    """Return (is heading, name of the rule that decided) for a line."""
     if not text or len(text.strip()) < 2:
-        return False
+        return False, 'short'
     
     text = text.strip()
     
     # Skip very long lines (likely paragraphs)
     if len(text) > 200:
-        return False
+        return False, 'too_long'
     
     # Skip lines that end with periods (likely sentences)
     if text.endswith('.'):
-        return False
+        return False, 'sentence'
     
     # Font size criterion
     font_size = font_info.get('size', 0)
     if font_size <= avg_font_size * 1.1:
-        return False
+        return False, 'small_font'
     
-    # Check for numbered headings (multilingual)
-    numbered_patterns = [
-        r'^\d+\.?\s+',  # "1. " or "1 "
-        r'^\d+\.\d+\.?\s+',  # "1.1. " or "1.1 "
-        r'^\d+\.\d+\.\d+\.?\s+',  # "1.1.1. " or "1.1.1 "
-        r'^[IVXLCDM]+\.?\s+',  # Roman numerals
-        r'^[A-Z]\.\s+',  # "A. "
-        r'^\([a-z]\)\s+',  # "(a) "
-    ]
+    # Bold text is more likely to be a heading
+    if font_info.get('weight') == 'bold':
+        return True, 'bold'
     
-    # Japanese/Chinese specific patterns
-    if language in ['ja', 'zh', 'ko']:
-        numbered_patterns.extend([
-            r'^第[一二三四五六七八九十百千万]+章\s*',  # Japanese chapter
-            r'^第[0-9]+章\s*',  # Numbered chapter
-            r'^[一二三四五六七八九十百千万]+[、．]\s*',  # Chinese numerals
-        ])
+    cue = heading_cue(text, language)
+    return cue is not None, cue or 'no_cue'
+
+
+# Rule regex scans heading_cue runs before settling on each outcome.
+CUE_REGEX_EVALUATIONS = {'numbered': 1, 'keyword': 2, 'all_caps': 2, 'title_case': 2, 'no_cue': 2}
+
+
+def heading_cue(text: str, language: str = 'en') -> Optional[str]:
+    """Return the first text-only heading cue that matches, or None."""
+    rules = get_rules(language)
     
-    for pattern in numbered_patterns:
-        if re.match(pattern, text):
-            return True
+    # Check for numbered headings (multilingual)
+    if rules.is_numbered(text):
+        return 'numbered'
     
     # Check for common heading keywords (multilingual)
-    heading_keywords = {
-        'en': ['chapter', 'section', 'introduction', 'conclusion', 'abstract', 'summary', 'overview', 'background'],
-        'ja': ['章', '節', '項', '序論', '結論', '概要', '背景', 'まとめ'],
-        'zh': ['章', '节', '部分', '引言', '结论', '摘要', '概述', '背景'],
-        'es': ['capítulo', 'sección', 'introducción', 'conclusión', 'resumen'],
-        'fr': ['chapitre', 'section', 'introduction', 'conclusion', 'résumé'],
-        'de': ['kapitel', 'abschnitt', 'einleitung', 'schluss', 'zusammenfassung'],
-    }
-    
-    keywords = heading_keywords.get(language, heading_keywords['en'])
-    text_lower = text.lower()
-    
-    for keyword in keywords:
-        if keyword in text_lower:
-            return True
-    
-    # Bold text is more likely to be a heading
-    if font_info.get('weight') == 'bold':
-        return True
+    if rules.has_keyword(text.lower()):
+        return 'keyword'
     
     # Check if text is all caps (common for headings)
     if text.isupper() and len(text) > 3:
-        return True
+        return 'all_caps'
     
     # Check capitalization pattern (Title Case)
     words = text.split()
     if len(words) >= 2:
         capitalized_words = sum(1 for word in words if word and word[0].isupper())
         if capitalized_words / len(words) >= 0.7:  # 70% of words capitalized
-            return True
+            return 'title_case'
     
-    return False
+    return None
+
 
+def detect_heading_level(text: str, font_info: Dict, font_sizes: Union[FontStatistics, List[float]],
+                         language: str = 'en') -> Optional[str]:
+    """Detect the heading level (H1, H2, H3) based on font size and content.
 
-def detect_heading_level(text: str, font_info: Dict, font_sizes: List[float], language: str = 'en') -> Optional[str]:
-    """Detect the heading level (H1, H2, H3) based on font size and content."""
+    ``font_sizes`` should be the document's FontStatistics; a plain list of
+    sizes is still accepted but is ranked from scratch on every call.
+    """
     if not font_sizes:
         return "H1"  # Default if no font size information
     
-    font_size = font_info.get('size', 0)
-    
-    # Sort font sizes in descending order
-    sorted_sizes = sorted(set(font_sizes), reverse=True)
+    if not isinstance(font_sizes, FontStatistics):
+        font_sizes = FontStatistics.from_sizes(font_sizes)
     
     # Determine level based on font size ranking
-    if len(sorted_sizes) >= 3:
-        if font_size >= sorted_sizes[0]:
-            level = "H1"
-        elif font_size >= sorted_sizes[1]:
-            level = "H2"
-        else:
-            level = "H3"
-    elif len(sorted_sizes) == 2:
-        if font_size >= sorted_sizes[0]:
-            level = "H1"
-        else:
-            level = "H2"
-    else:
-        level = "H1"
+    level = font_sizes.level_for_size(font_info.get('size', 0))
     
     # Adjust level based on content patterns
     text_clean = text.strip()
     
-    # Check for explicit numbering patterns that indicate level
-    if re.match(r'^\d+\.\s+', text_clean):  # "1. "
-        level = "H1"
-    elif re.match(r'^\d+\.\d+\.\s+', text_clean):  # "1.1. "
-        level = "H2"
-    elif re.match(r'^\d+\.\d+\.\d+\.\s+', text_clean):  # "1.1.1. "
-        level = "H3"
-    
-    # Japanese/Chinese specific level detection
-    if language in ['ja', 'zh', 'ko']:
-        if re.match(r'^第[一二三四五六七八九十百千万]+章', text_clean):
-            level = "H1"
-        elif re.match(r'^第[一二三四五六七八九十百千万]+節', text_clean):
-            level = "H2"
-        elif re.match(r'^第[一二三四五六七八九十百千万]+項', text_clean):
-            level = "H3"
+    # Explicit numbering (1., 1.1., 第一章, ...) overrides the font-size level
+    numbering_level = get_rules(language).numbering_level(text_clean)
+    if numbering_level:
+        level = numbering_level
     
     return level
 
@@ -197,21 +165,15 @@ def extract_title_from_text(text: str, max_length: int = 100) -> str:
 
 def is_multilingual_text(text: str) -> Tuple[bool, str]:
     """Detect if text contains multilingual content."""
-    try:
-        language = detect(text)
-        
-        # Check for mixed scripts
-        has_latin = bool(re.search(r'[a-zA-Z]', text))
-        has_cjk = bool(re.search(r'[\u4e00-\u9fff\u3040-\u309f\u30a0-\u30ff]', text))
-        has_arabic = bool(re.search(r'[\u0600-\u06ff]', text))
-        has_cyrillic = bool(re.search(r'[\u0400-\u04ff]', text))
-        
-        script_count = sum([has_latin, has_cjk, has_arabic, has_cyrillic])
-        
-        return script_count > 1, language
-    
-    except LangDetectException:
-        return False, 'en'
+    language = detect_language(text)
+    
+    # Check for mixed scripts; kana and Han together are one CJK script
+    histogram = script_histogram(text)
+    has_cjk = histogram['kana'] or histogram['han']
+    script_count = sum(1 for present in (histogram['latin'], has_cjk, histogram['arabic'], histogram['cyrillic'])
+                       if present)
+    
+    return script_count > 1, language
 
 
 def clean_heading_text(text: str, language: str = 'en') -> str:
@@ -221,25 +183,7 @@ def clean_heading_text(text: str, language: str = 'en') -> str:
     
     cleaned = normalize_text(text)
     
-    # Remove common numbering patterns
-    patterns_to_remove = [
-        r'^\d+\.?\s*',  # "1. " or "1 "
-        r'^\d+\.\d+\.?\s*',  # "1.1. " or "1.1 "
-        r'^\d+\.\d+\.\d+\.?\s*',  # "1.1.1. " or "1.1.1 "
-        r'^[IVXLCDM]+\.?\s*',  # Roman numerals
-        r'^[A-Z]\.\s*',  # "A. "
-        r'^\([a-z]\)\s*',  # "(a) "
-    ]
-    
-    # Language-specific patterns
-    if language in ['ja', 'zh', 'ko']:
-        patterns_to_remove.extend([
-            r'^第[一二三四五六七八九十百千万]+章\s*',
-            r'^第[0-9]+章\s*',
-            r'^[一二三四五六七八九十百千万]+[、．]\s*',
-        ])
-    
-    for pattern in patterns_to_remove:
-        cleaned = re.sub(pattern, '', cleaned)
+    # Remove a leading numbering prefix
+    cleaned = get_rules(language).strip_numbering(cleaned)
     
-    return cleaned.strip()
\ No newline at end of file
+    return cleaned.strip()